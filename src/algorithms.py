@@ -0,0 +1,95 @@
+import importlib.util
+import threading
+from importlib import metadata
+
+from . import settings as st
+from .classes import LayoutAlgorithms as LA
+from .settings import log
+
+
+class AlgorithmRegistry:
+    """Registry of the available layout algorithms. The networkx algorithms are always available, the cartoGRAPHs algorithms if cartoGRAPHs is installed. Further layout engines are registered by other packages through the entry point group settings.LAYOUT_ENGINE_GROUP, the name of an entry point is the name of its algorithm. Nothing is detected before the registry is used for the first time, optional backends are detected by a spec lookup and an engine is only imported when its algorithm is used.
+
+    An engine is a callable engine(graph, dim, **variables) which returns the position of each node of the graph.
+
+    group (str, optional): entry point group of the layout engines. Defaults to settings.LAYOUT_ENGINE_GROUP.
+    """
+
+    def __init__(self, group: str = None) -> None:
+        if group is None:
+            group = st.LAYOUT_ENGINE_GROUP
+        self.group: str = group
+        self._algorithms: dict[str, metadata.EntryPoint or None] = None
+        self._engines: dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def names(self) -> list[str]:
+        """Names of all available algorithms."""
+        return list(self._detect())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._detect()
+
+    def register(self, name: str, engine) -> None:
+        """Registers a layout engine of this process.
+
+        Args:
+            name (str): name of the algorithm.
+            engine (Callable): engine which calculates the layout.
+        """
+        self._detect()
+        with self._lock:
+            self._algorithms[name] = None
+            self._engines[name] = engine
+
+    def engine(self, name: str):
+        """Returns the engine of a registered algorithm and imports it if necessary.
+
+        Args:
+            name (str): name of the algorithm.
+
+        Returns:
+            Callable or None: engine of the algorithm, None for the built-in algorithms.
+        """
+        entry_point = self._detect().get(name)
+        with self._lock:
+            if name not in self._engines and entry_point is not None:
+                self._engines[name] = entry_point.load()
+            return self._engines.get(name)
+
+    def refresh(self) -> None:
+        """Forgets the detected algorithms, e.g. after installing a package."""
+        with self._lock:
+            self._algorithms = None
+            self._engines.clear()
+
+    def _detect(self) -> dict:
+        with self._lock:
+            if self._algorithms is None:
+                algorithms = dict.fromkeys([LA.spring, LA.kamada_kawai])
+                if importlib.util.find_spec("cartoGRAPHs") is not None:
+                    algorithms.update(dict.fromkeys(LA.cartoGRAPH_algos))
+                for entry_point in self._entry_points():
+                    algorithms.setdefault(entry_point.name, entry_point)
+                self._algorithms = algorithms
+                log.debug(f"Available layout algorithms: {list(algorithms)}")
+            return self._algorithms
+
+    def _entry_points(self) -> list[metadata.EntryPoint]:
+        try:
+            return list(metadata.entry_points(group=self.group))
+        except TypeError:  # Python < 3.10
+            return list(metadata.entry_points().get(self.group, []))
+
+
+_REGISTRY = AlgorithmRegistry()
+
+
+def available_algorithms() -> list[str]:
+    """Names of all available layout algorithms, see AlgorithmRegistry."""
+    return _REGISTRY.names()
+
+
+def layout_engine(name: str):
+    """Returns the engine of a layout algorithm of a plugin, see AlgorithmRegistry.engine."""
+    return _REGISTRY.engine(name)
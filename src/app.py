@@ -1,6 +1,4 @@
 import json
-import multiprocessing as mp
-import uuid
 
 import flask
 
@@ -12,9 +10,13 @@ from project import Project
 from . import routes
 from . import settings as st
 from . import util as my_util
-from .classes import LayoutAlgorithms
-from .send_to_cytoscape import send_to_cytoscape
+from .algorithms import available_algorithms
+from .job_store import JobStore
+from .manifest import digest
+from .network_registry import NetworkRegistry
+from .send_pool import SendPool, send_network
 from .settings import log
+from .upload_jobs import UploadQueue
 
 url_prefix = "/CyEx"
 
@@ -29,7 +31,11 @@ blueprint = IOBlueprint(
 column_4 = ["cyEx_send_module.html"]
 upload_tabs = []
 
-submitted_jobs = {"test": {"data": "test"}}
+submitted_jobs = JobStore()
+upload_queue = UploadQueue()
+# Its workers are only started by the first send.
+send_pool = SendPool()
+sent_networks = NetworkRegistry()
 my_util.prepare_uploader()
 my_util.move_on_boot()
 
@@ -70,7 +76,7 @@ def cy_ex_upload() -> str:
         if job not in submitted_jobs:
             job = False
     return flask.render_template(
-        "cyEx_upload.html", layAlgos=LayoutAlgorithms.all_algos, job=job
+        "cyEx_upload.html", layAlgos=available_algorithms(), job=job
     )
 
 
@@ -80,10 +86,10 @@ def cy_ex_cy_submit():
     json_data = flask.request.get_json()
     log.debug(json_data)
 
-    # Generate a unique Job ID
-    job_id = str(uuid.uuid4())
+    # The Job ID is the content hash of the network, so that resubmitting the same network maps to the same job.
+    job_id = digest(json_data)
 
-    # Store the JSON data and settings related to this Job ID
+    # Store the JSON data and settings related to this Job ID. The payload is spilled to disk.
     submitted_jobs[job_id] = json_data
 
     # Respond with the URL associated with this Job ID
@@ -93,36 +99,98 @@ def cy_ex_cy_submit():
 
 @blueprint.route("/vrnetz_upload", methods=["GET", "POST"])
 def cy_ex_vrnetz_upload() -> str:
-    """This route is used to upload a VRNetz using the STRING Uploader. A POST request is send to it, when a user clicks the "upload" button.
+    """This route is used to upload a VRNetz using the STRING Uploader. A POST request is send to it, when a user clicks the "upload" button. The upload is queued and runs in the background, its progress is reported by /upload_status.
 
     Returns:
-        str: A status giving information whether the upload was successful or not.
+        str: The state of the queued upload or an error message if the request is invalid.
     """
     form = flask.request.form.to_dict()
     job = form.get("job")
     log.debug(form)
+    # Loaded lazily, only the job requested by the form is read from disk.
     network = submitted_jobs.get(job)
-    return routes.upload_vrnetz(network)
+    return routes.upload_vrnetz(upload_queue, network)
+
+
+@blueprint.route("/upload_status/<job_id>", methods=["GET"])
+def cy_ex_upload_status(job_id: str):
+    """Status of a queued upload. Is polled by the upload page until the upload is done.
+
+    Args:
+        job_id (str): ID of the upload returned by /vrnetz_upload.
+
+    Returns:
+        flask.Response: State of the upload, see UploadJob.to_dict.
+    """
+    job = upload_queue.get(job_id)
+    if job is None:
+        return flask.jsonify({"id": job_id, "status": "unknown"}), 404
+    return flask.jsonify(job.to_dict())
 
 
 @blueprint.on(
     "sendNetwork",
 )
 def string_send_to_cytoscape(message):
-    """Is triggered by a call of a client. Will take the current selected nodes and links to send them to a running instance of Cytoscape. This will always send the network the Cytoscape session of the requesting user, if not otherwise specified. If to host is selected, the network will be send to the Cytoscape session of the Server host."""
+    """Is triggered by a call of a client. Will take the current selected nodes and links to send them to a running instance of Cytoscape. This will always send the network the Cytoscape session of the requesting user, if not otherwise specified. If to host is selected, the network will be send to the Cytoscape session of the Server host.
+
+    The send runs on the SendPool and this handler returns right away. Only one send of a project per client runs at a time, as both would update the same network in Cytoscape. The stages of the send are emitted as "sendProgress" and its final status as "status" to the requesting client only.
+
+    Returns:
+        dict: state of the send with its "id", which is passed to the acknowledgement callback of the client.
+    """
     log.debug("Requested to send a network to Cytoscape. Will handle this request.")
-    return_dict = mp.Manager().dict()
     ip = flask.request.remote_addr
-    p = mp.Process(
-        target=send_to_cytoscape,
-        args=(ip, return_dict, GD.pdata, GD.pfile),
-    )
-    p.start()
-    p.join(timeout=300)
-    p.terminate()
-    if p.exitcode is None:
-        return_dict["status"] = {
-            "message": f"Process timed out. Please do not remove networks or views fom Cytoscape while the process is running.",
+    room = flask.request.sid
+    # Networks are updated in place if the same client sends the same project again.
+    key = (ip, (GD.pfile or {}).get("name"))
+    acquired, previous = sent_networks.acquire(key)
+    if not acquired:
+        state = {
+            "id": None,
+            "message": "This project is already being sent to Cytoscape. Please wait until the send has finished.",
             "status": "error",
         }
-    blueprint.emit("status", return_dict["status"])
+        blueprint.emit("status", state, room=room)
+        return state
+
+    def notify(event: dict) -> None:
+        if "stage" in event:
+            blueprint.emit("sendProgress", event, room=room)
+            return
+        sent_networks.release(key, event.pop("network", None))
+        blueprint.emit("status", event, room=room)
+
+    state = send_pool.submit(
+        send_network,
+        ip,
+        GD.pdata,
+        GD.pfile,
+        previous,
+        notify=notify,
+        owner=room,
+    )
+    if state["id"] is None:
+        sent_networks.release(key, previous)
+        blueprint.emit("status", state, room=room)
+    else:
+        blueprint.emit("sendProgress", {**state, "stage": "queued"}, room=room)
+    return state
+
+
+@blueprint.on(
+    "cancelSend",
+)
+def string_cancel_send(message):
+    """Is triggered by a client to cancel one of its sends. Sends of other clients are not cancelled.
+
+    Args:
+        message (dict): contains the "id" of the send.
+
+    Returns:
+        dict: whether the send was cancelled.
+    """
+    send_id = message.get("id") if isinstance(message, dict) else None
+    cancelled = send_pool.cancel(send_id, owner=flask.request.sid)
+    log.debug(f"Cancel of send {send_id} requested, cancelled: {cancelled}")
+    return {"id": send_id, "cancelled": cancelled}
@@ -0,0 +1,228 @@
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+from project import Project
+
+from . import settings as st
+from . import sidecar
+from . import textures as tex
+from .cx2 import build_cx2, push_cx2
+from .cyrest_client import get_client
+from .mock_cyrest import MockCyREST
+from .progress import ProgressReporter
+from .send_to_cytoscape import extract_link_data, extract_node_data, send_to_cytoscape
+from .settings import log
+
+SIZES = [10, 100, 1000, 10000, 50000]  # Default numbers of selected nodes
+LAYOUT = "benchXYZ"
+COLOR = "benchRGB"
+
+
+def generate_project(
+    name: str, n_nodes: int, n_links: int, seed: int = 0
+) -> Project:
+    """Writes a random project containing everything a send reads: the nodes and links with their sidecar index, one layout and one color texture.
+
+    Args:
+        name (str): name of the project.
+        n_nodes (int): number of nodes.
+        n_links (int): number of links.
+        seed (int, optional): seed of the random network. Defaults to 0.
+
+    Returns:
+        Project: the generated project.
+    """
+    rng = np.random.default_rng(seed)
+    project = Project(name)
+    project.create_all_directories()
+    location = project.location
+
+    ids = np.arange(n_nodes)
+    nodes = pd.DataFrame(
+        {
+            "id": ids,
+            "n": [f"node{i}" for i in ids],
+            "degree": rng.integers(1, 100, n_nodes),
+        }
+    )
+    links = pd.DataFrame(
+        {
+            "id": np.arange(n_links),
+            "s": rng.integers(0, n_nodes, n_links),
+            "e": rng.integers(0, n_nodes, n_links),
+        }
+    )
+    sidecar.write_indexed(location, "nodes", nodes)
+    sidecar.write_indexed(location, "links", links, sidecar.link_columns(links))
+
+    hight = tex.node_tex_height(n_nodes)
+    high, low = tex.encode_positions(rng.random((n_nodes, 3)))
+    colors = rng.integers(0, 256, (n_nodes, 4), dtype=np.uint8)
+    images = {
+        os.path.join("layouts", f"{LAYOUT}.bmp"): (high, "RGB"),
+        os.path.join("layoutsl", f"{LAYOUT}l.bmp"): (low, "RGB"),
+        os.path.join("layoutsRGB", f"{COLOR}.png"): (colors, "RGBA"),
+    }
+    for file, (pixels, mode) in images.items():
+        image = tex.pad_pixels(pixels, tex.NODE_TEX_WIDTH, hight)
+        Image.fromarray(image, mode).save(os.path.join(location, file))
+
+    project.pfile = {
+        "name": name,
+        "layouts": [LAYOUT],
+        "layoutsRGB": [COLOR],
+        "nodecount": n_nodes,
+        "linkcount": n_links,
+    }
+    project.write_pfile()
+    return project
+
+
+class StageTimer(ProgressReporter):
+    """Measures the seconds spent in each stage of a send."""
+
+    def __init__(self) -> None:
+        super().__init__(min_interval=0)
+        self.times: dict[str, float] = {}
+        self._current: tuple[str, float] = None
+
+    def stage(self, name: str, total: int = None, unit: str = "items") -> None:
+        self.stop()
+        self._current = (name, time.perf_counter())
+        super().stage(name, total, unit)
+
+    def stop(self) -> None:
+        if self._current is not None:
+            name, start = self._current
+            self.times[name] = self.times.get(name, 0) + time.perf_counter() - start
+            self._current = None
+
+
+def _timed(func, *args, **kwargs) -> tuple[object, float]:
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def benchmark_selection(
+    project: Project, mock: MockCyREST, n_selected: int, seed: int = 0
+) -> dict:
+    """Times each stage of a send of n_selected random nodes and counts the requests it sends to cyREST.
+
+    Args:
+        project (Project): generated project, see generate_project.
+        mock (MockCyREST): running mock, listening on settings.CYREST_PORT of 127.0.0.1.
+        n_selected (int): number of selected nodes.
+        seed (int, optional): seed of the selection. Defaults to 0.
+
+    Returns:
+        dict: seconds of each stage and the round trips of the import and the full send.
+    """
+    rng = np.random.default_rng(seed)
+    selected = rng.choice(
+        project.pfile["nodecount"], n_selected, replace=False
+    ).tolist()
+    result = {"nodes": n_selected}
+
+    nodes, result["extract_nodes"] = _timed(
+        extract_node_data, selected, project, LAYOUT, COLOR
+    )
+    (links, _), result["extract_links"] = _timed(
+        extract_link_data, selected, [], project
+    )
+    result["links"] = len(links)
+    document, result["build_cx2"] = _timed(build_cx2, nodes, links, project.name)
+
+    mock.reset()
+    _, result["push_cx2"] = _timed(push_cx2, mock.base_url, document, project.name)
+    result["push_round_trips"] = mock.round_trips
+
+    pdata = {"cbnode": [{"id": i} for i in selected], "layoutsDD": 0, "layoutsRGBDD": 0}
+    timer = StageTimer()
+    mock.reset()
+    # Sends start with a cold client, as the first send to a host does.
+    get_client(mock.base_url).invalidate()
+    status, result["send"] = _timed(
+        send_to_cytoscape, "127.0.0.1", pdata, project.pfile, progress=timer
+    )
+    timer.stop()
+    result["send_round_trips"] = mock.round_trips
+    result["send_status"] = status["status"]
+    result.update({f"send_{name}": t for name, t in timer.times.items()})
+    return result
+
+
+def run(
+    sizes: list[int] = SIZES,
+    n_nodes: int = None,
+    n_links: int = None,
+    latency: float = 0,
+    seed: int = 0,
+    keep: bool = False,
+) -> pd.DataFrame:
+    """Benchmarks the send path for each selection size on a generated project against a mock cyREST.
+
+    Args:
+        sizes (list[int], optional): numbers of selected nodes. Defaults to SIZES.
+        n_nodes (int, optional): nodes of the generated project. Defaults to the largest selection.
+        n_links (int, optional): links of the generated project. Defaults to 5 per node.
+        latency (float, optional): seconds the mock delays each request. Defaults to 0.
+        seed (int, optional): seed of the project and the selections. Defaults to 0.
+        keep (bool, optional): whether to keep the generated project. Defaults to False.
+
+    Returns:
+        pd.DataFrame: one row of timings and round trips per selection size.
+    """
+    if n_nodes is None:
+        n_nodes = max(sizes)
+    if n_links is None:
+        n_links = 5 * n_nodes
+    sizes = [s for s in sizes if s <= n_nodes]
+    name = f"cyex_benchmark_{n_nodes}_{n_links}_{seed}"
+    project, seconds = _timed(generate_project, name, n_nodes, n_links, seed)
+    log.info(
+        f"Generated project {name} with {n_nodes} nodes and {n_links} links in {seconds:.2f}s",
+        runtime=True,
+    )
+    port = st.CYREST_PORT
+    rows = []
+    try:
+        with MockCyREST(latency=latency) as mock:
+            # Sends connect to the default port of the host, point them to the mock.
+            st.CYREST_PORT = mock.port
+            for size in sizes:
+                rows.append(benchmark_selection(project, mock, size, seed))
+                log.info(f"Benchmarked send of {size} nodes: {rows[-1]}", runtime=True)
+    finally:
+        st.CYREST_PORT = port
+        if not keep:
+            shutil.rmtree(project.location, ignore_errors=True)
+    return pd.DataFrame(rows).set_index("nodes")
+
+
+def main(argv: list[str] = None) -> None:
+    """Command line entry point. Run from the backend directory, e.g. python -m extensions.CyEx.src.benchmark --sizes 10 1000 --latency 0.005"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the send path of CyEx against a mock cyREST."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--nodes", type=int, default=None)
+    parser.add_argument("--links", type=int, default=None)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args(argv)
+    results = run(
+        args.sizes, args.nodes, args.links, args.latency, args.seed, args.keep
+    )
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(results.round(4))
+
+
+if __name__ == "__main__":
+    main()
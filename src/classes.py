@@ -1,8 +1,3 @@
-try:
-    from pip._internal.operations import freeze
-except ImportError:  # pip < 10.0
-    from pip.operations import freeze
-
 import sys
 from enum import Enum
 
@@ -112,12 +107,11 @@ class VRNetzElements:
 
 class LayoutAlgorithms:
     """
-    This class provides access to all available layout algorithms.
+    This class provides access to the names of the layout algorithms. Which of them are available is detected by the algorithms module.
     """
 
     spring = "spring"
     kamada_kawai = "kamada_kawai"
-    all_algos = [spring, kamada_kawai]
     random = "random"
     cartoGRAPH = "cg"
     cartoGRAPH_local = "local"
@@ -126,17 +120,15 @@ class LayoutAlgorithms:
     cartoGRAPH_tsne = "tsne"
     cartoGRAPH_umap = "umap"
     cartoGRAPH_functional = "functional"
-
-    if "cartoGRAPHs" in [module.split("=")[0] for module in list(freeze.freeze())]:
-        all_algos += [
-            f"{cartoGRAPH}_{cartoGRAPH_local}_{cartoGRAPH_tsne}",
-            f"{cartoGRAPH}_{cartoGRAPH_local}_{cartoGRAPH_umap}",
-            f"{cartoGRAPH}_{cartoGRAPH_global}_{cartoGRAPH_tsne}",
-            f"{cartoGRAPH}_{cartoGRAPH_global}_{cartoGRAPH_umap}",
-            f"{cartoGRAPH}_{cartoGRAPH_importance}_{cartoGRAPH_tsne}",
-            f"{cartoGRAPH}_{cartoGRAPH_importance}_{cartoGRAPH_umap}",
-            f"{cartoGRAPH}_{cartoGRAPH_functional}_{cartoGRAPH_umap}",
-        ]
+    cartoGRAPH_algos = [
+        f"{cartoGRAPH}_{cartoGRAPH_local}_{cartoGRAPH_tsne}",
+        f"{cartoGRAPH}_{cartoGRAPH_local}_{cartoGRAPH_umap}",
+        f"{cartoGRAPH}_{cartoGRAPH_global}_{cartoGRAPH_tsne}",
+        f"{cartoGRAPH}_{cartoGRAPH_global}_{cartoGRAPH_umap}",
+        f"{cartoGRAPH}_{cartoGRAPH_importance}_{cartoGRAPH_tsne}",
+        f"{cartoGRAPH}_{cartoGRAPH_importance}_{cartoGRAPH_umap}",
+        f"{cartoGRAPH}_{cartoGRAPH_functional}_{cartoGRAPH_umap}",
+    ]
 
 
 class Evidences(Enum):
@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+import requests
+
+from .progress import ProgressReporter, stage
+from .settings import log
+
+STYLE = "VRNetzer_Style"
+
+# Columns which are passed through to a visual property of the nodes. The positions are mapped as well, so that updating their columns moves the nodes.
+NODE_MAPPINGS = {
+    "NODE_BACKGROUND_COLOR": "color",
+    "NODE_LABEL": "name",
+    "NODE_WIDTH": "size",
+    "NODE_HEIGHT": "size",
+    "NODE_X_LOCATION": "x",
+    "NODE_Y_LOCATION": "y",
+    "NODE_Z_LOCATION": "z",
+}
+POSITIONS = ["x", "y", "z"]
+
+
+def _cx_type(column: pd.Series) -> str:
+    dtype = column.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "long"
+    if pd.api.types.is_float_dtype(dtype):
+        return "double"
+    return "string"
+
+
+def _attributes(df: pd.DataFrame) -> tuple[dict, list[dict]]:
+    """Declares the columns of a data frame as CX2 attributes and collects the values of each row. Null values are left out.
+
+    Args:
+        df (pd.DataFrame): nodes or edges.
+
+    Returns:
+        tuple[dict, list[dict]]: attribute declarations and the values of each row.
+    """
+    declarations = {}
+    columns = {}
+    for name in df.columns:
+        column = df[name]
+        data_type = _cx_type(column)
+        declarations[str(name)] = {"d": data_type}
+        mask = column.isna().to_numpy()
+        if data_type == "string":
+            values = [None if null else str(v) for v, null in zip(column.tolist(), mask)]
+        else:
+            values = [None if null else v for v, null in zip(column.tolist(), mask)]
+        columns[str(name)] = values
+    rows = [{} for _ in range(len(df))]
+    for name, values in columns.items():
+        for row, value in zip(rows, values):
+            if value is not None:
+                row[name] = value
+    return declarations, rows
+
+
+def build_cx2(nodes: pd.DataFrame, links: pd.DataFrame, title: str) -> list[dict]:
+    """Builds a CX2 document of the extracted nodes and links. Contains the positions of the nodes and the VRNetzer style, which passes the color, name, size and position of each node through to its visual properties.
+
+    Args:
+        nodes (pd.DataFrame): nodes as returned by extract_node_data. Its index are the node ids.
+        links (pd.DataFrame): links as returned by extract_link_data.
+        title (str): name of the network.
+
+    Returns:
+        list[dict]: aspects of the CX2 document.
+    """
+    node_ids = nodes.index.to_numpy(np.int64)
+    node_declarations, node_values = _attributes(nodes)
+    positions = [
+        nodes[c].to_numpy(np.float64).tolist() if c in nodes.columns else None
+        for c in POSITIONS
+    ]
+    cx_nodes = []
+    for idx, (node_id, values) in enumerate(zip(node_ids.tolist(), node_values)):
+        node = {"id": node_id, "v": values}
+        for key, coords in zip(POSITIONS, positions):
+            if coords is not None and coords[idx] == coords[idx]:
+                node[key] = coords[idx]
+        cx_nodes.append(node)
+
+    edges = links.drop(columns=[c for c in ["source", "target"] if c in links.columns])
+    edge_declarations, edge_values = _attributes(edges)
+    cx_edges = []
+    if len(links):
+        sources = pd.to_numeric(links["source"]).to_numpy(np.int64).tolist()
+        targets = pd.to_numeric(links["target"]).to_numpy(np.int64).tolist()
+        cx_edges = [
+            {"id": idx, "s": s, "t": t, "v": values}
+            for idx, (s, t, values) in enumerate(zip(sources, targets, edge_values))
+        ]
+
+    node_mapping = {
+        prop: {
+            "type": "PASSTHROUGH",
+            "definition": {
+                "attribute": column,
+                "type": node_declarations[column]["d"],
+            },
+        }
+        for prop, column in NODE_MAPPINGS.items()
+        if column in node_declarations
+        # 2D projects have no z values, their nodes are not mapped to a z location.
+        and (column not in POSITIONS or nodes[column].notna().any())
+    }
+    visual_properties = {
+        "default": {
+            "network": {},
+            "node": {"NODE_BACKGROUND_COLOR": "#000000", "NODE_SHAPE": "ellipse"},
+            "edge": {},
+        },
+        "nodeMapping": node_mapping,
+    }
+    aspects = {
+        "attributeDeclarations": [
+            {
+                "networkAttributes": {"name": {"d": "string"}},
+                "nodes": node_declarations,
+                "edges": edge_declarations,
+            }
+        ],
+        "networkAttributes": [{"name": title}],
+        "nodes": cx_nodes,
+        "edges": cx_edges,
+        "visualProperties": [visual_properties],
+    }
+    return [
+        {"CXVersion": "2.0", "hasFragments": False},
+        {
+            "metaData": [
+                {"name": name, "elementCount": len(elements)}
+                for name, elements in aspects.items()
+            ]
+        },
+        *({name: elements} for name, elements in aspects.items()),
+        {"status": [{"error": "", "success": True}]},
+    ]
+
+
+def network_suid(response) -> int:
+    """Extracts the SUID of an imported network from the response of cyREST.
+
+    Args:
+        response (dict or list): JSON response of POST /networks.
+
+    Returns:
+        int: SUID of the new network.
+    """
+    if isinstance(response, list):
+        response = response[0]
+    if isinstance(response, dict) and "data" in response:
+        response = response["data"]
+    suid = response["networkSUID"]
+    if isinstance(suid, list):
+        suid = suid[0]
+    return int(suid)
+
+
+def push_cx2(
+    base_url: str,
+    document: list[dict],
+    collection: str,
+    session=None,
+    timeout=300,
+    progress: ProgressReporter = None,
+) -> int:
+    """Imports a CX2 document into Cytoscape with a single request and fits the view to it.
+
+    Args:
+        base_url (str): URL of cyREST, e.g. http://localhost:1234/v1.
+        document (list[dict]): CX2 document, see build_cx2.
+        collection (str): name of the collection the network is added to.
+        session (requests.Session, optional): session used for the requests. Defaults to None.
+        timeout (int, optional): seconds until the import is aborted. Defaults to 300.
+        progress (ProgressReporter, optional): reports the stage "fit". Defaults to None.
+
+    Raises:
+        requests.exceptions.RequestException: if cyREST did not accept the document.
+
+    Returns:
+        int: SUID of the new network.
+    """
+    http = session or requests
+    response = http.post(
+        f"{base_url}/networks",
+        params={"format": "cx2", "collection": collection},
+        json=document,
+        timeout=timeout,
+    )
+    response.raise_for_status()
+    suid = network_suid(response.json())
+    log.debug(f"Imported CX2 network with SUID: {suid}")
+    stage(progress, "fit")
+    try:
+        http.get(f"{base_url}/apply/fit/{suid}", timeout=timeout).raise_for_status()
+    except requests.exceptions.RequestException as e:
+        log.warning(f"Could not fit network {suid}: {e}")
+    return suid
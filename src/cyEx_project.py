@@ -11,6 +11,7 @@ from .classes import LinkTags as LiT
 from .classes import NodeTags as NT
 from .classes import VRNetzElements as VRNE
 from .layout import Layout, normalize_pos
+from .progress import ProgressReporter, advance, stage
 from .settings import log
 
 
@@ -39,6 +40,7 @@ class CyExProject(Project):
         self._is_string_network: bool = False
         self.overwrite: bool = overwrite
         self.layouts: list[Layout] = []
+        self.link_colors: dict[str, tuple] = {}  # Link layouts with a single color
         # #TODO: How to handle overwrites
 
         # if form["string_namespace"] == "New":
@@ -154,11 +156,23 @@ class CyExProject(Project):
             nodes[l.name + "_pos"] = pd.Series(pos.tolist())
         self.network[VRNE.nodes] = nodes
 
-    def calculate_layouts(self):
+    def calculate_layouts(self, progress: ProgressReporter = None):
+        """Calculates all added layouts and adds them to the nodes of the network.
+
+        Args:
+            progress (ProgressReporter, optional): reports each finished layout. Defaults to None.
+        """
         ## Handle Nodes
+        stage(progress, "layouts", total=len(self.layouts), unit="layouts")
         for layout in self.layouts:
             layout.calculate_layout()
             layout.normalize_pos()
+            advance(
+                progress,
+                layout=layout.name,
+                algorithm=layout.algo,
+                nodes=self.graph.number_of_nodes(),
+            )
         self.handle_cy_layout()
         self.add_layouts_to_network()
 
@@ -167,7 +181,7 @@ class CyExProject(Project):
         # links = generator.gen_evidence_layouts(
         #     generator.network[VRNE.links], stringify=stringify
         # )
-        self.network[VRNE.links]["all_col"] = [(200, 200, 200, 255)] * self.l
+        self.link_colors["all_col"] = (200, 200, 200, 255)
         links = self.network[VRNE.links]
         drops = ["s_suid", "e_suid"]
         for c in drops:
@@ -190,7 +204,7 @@ class CyExProject(Project):
                 x["size"] = layout["s"]
                 return x
 
-            nodes = nodes.swifter.progress_bar(False).apply(extract_cy, axis=1)
+            nodes = nodes.apply(extract_cy, axis=1)
 
         if "cy_pos" and "cy_col" in nodes:
             coords = nodes["cy_pos"].to_dict()
@@ -204,14 +218,8 @@ class CyExProject(Project):
                 return col
 
             max_size = max(nodes["size"])
-            nodes["size"] = (
-                nodes["size"].swifter.progress_bar(False).apply(lambda x: x / max_size)
-            )
-            nodes["cy_col"] = (
-                nodes[["cy_col", "size"]]
-                .swifter.progress_bar(False)
-                .apply(extract_color, axis=1)
-            )
+            nodes["size"] = nodes["size"] / max_size
+            nodes["cy_col"] = nodes[["cy_col", "size"]].apply(extract_color, axis=1)
 
         self.network[VRNE.nodes] = nodes
 
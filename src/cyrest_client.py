@@ -0,0 +1,172 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import settings as st
+from .settings import log
+
+# Clients of this process by base URL.
+_CLIENTS: dict[str, "CyRESTClient"] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client(base_url: str) -> "CyRESTClient":
+    """Returns the client of a Cytoscape host. Clients are kept for the lifetime of the process, so that repeated sends to the same host reuse its connections and cached capabilities.
+
+    Args:
+        base_url (str): URL of cyREST, e.g. http://localhost:1234/v1.
+
+    Returns:
+        CyRESTClient: client of the host.
+    """
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(base_url)
+        if client is None:
+            client = _CLIENTS[base_url] = CyRESTClient(base_url)
+        return client
+
+
+class CyRESTClient:
+    """Client of the cyREST API of a single Cytoscape host. Requests share a session with kept alive connections. Whether the host is reachable, its visual properties and its styles are cached for ttl seconds and invalidated as soon as a request fails.
+
+    base_url (str): URL of cyREST, e.g. http://localhost:1234/v1.
+    ttl (float, optional): seconds cached answers are valid. Defaults to settings.CYREST_CACHE_TTL.
+    pool_size (int, optional): number of kept alive connections. Defaults to settings.CYREST_POOL_SIZE.
+    timeout (float, optional): seconds until a request is aborted. Defaults to settings.SEND_TIMEOUT.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        ttl: float = None,
+        pool_size: int = None,
+        timeout: float = None,
+    ) -> None:
+        if ttl is None:
+            ttl = st.CYREST_CACHE_TTL
+        if pool_size is None:
+            pool_size = st.CYREST_POOL_SIZE
+        if timeout is None:
+            timeout = st.SEND_TIMEOUT
+        self.base_url: str = base_url
+        self.ttl: float = ttl
+        self.timeout: float = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._cache: dict[str, tuple[float, object]] = {}
+        self._lock = threading.Lock()
+
+    def ping(self) -> None:
+        """Checks whether cyREST is reachable.
+
+        Raises:
+            requests.exceptions.RequestException: if cyREST is not reachable.
+        """
+        self._cached("ping", self._ping)
+
+    def visual_property_names(self) -> set[str]:
+        """Visual properties supported by the host, e.g. NODE_Z_LOCATION is only supported by Cytoscape 3.10 and later.
+
+        Returns:
+            set[str]: names of the visual properties.
+        """
+        return self._cached(
+            "visual_properties",
+            lambda: {
+                p["visualProperty"] if isinstance(p, dict) else p
+                for p in self.get("styles/visualproperties")
+            },
+        )
+
+    def style_names(self) -> set[str]:
+        """Names of the visual styles of the host.
+
+        Returns:
+            set[str]: names of the visual styles.
+        """
+        return self._cached("styles", lambda: set(self.get("styles")))
+
+    def add_style(self, style: str) -> None:
+        """Records a visual style created on the host, so that the cached style names stay valid.
+
+        Args:
+            style (str): name of the created style.
+        """
+        with self._lock:
+            entry = self._cache.get("styles")
+            if entry is not None:
+                entry[1].add(style)
+
+    def invalidate(self) -> None:
+        """Drops every cached answer, e.g. after a failed send."""
+        with self._lock:
+            self._cache.clear()
+
+    def get(self, path: str):
+        """Sends a GET request to cyREST.
+
+        Args:
+            path (str): path relative to the base URL.
+
+        Raises:
+            requests.exceptions.RequestException: if the request fails.
+
+        Returns:
+            JSON response.
+        """
+        return self.request("GET", path)
+
+    def post(self, path: str, data):
+        """Sends a POST request with a JSON body to cyREST, see get."""
+        return self.request("POST", path, data)
+
+    def put(self, path: str, data):
+        """Sends a PUT request with a JSON body to cyREST, see get."""
+        return self.request("PUT", path, data)
+
+    def request(self, method: str, path: str, data=None):
+        """Sends a request to cyREST. Cached answers are dropped if it fails.
+
+        Args:
+            method (str): HTTP method.
+            path (str): path relative to the base URL.
+            data (optional): JSON body. Defaults to None.
+
+        Raises:
+            requests.exceptions.RequestException: if the request fails.
+
+        Returns:
+            JSON response, None if the response is empty.
+        """
+        url = f"{self.base_url}/{path}" if path else self.base_url
+        try:
+            response = self.session.request(
+                method, url, json=data, timeout=self.timeout
+            )
+            response.raise_for_status()
+            if not response.content:
+                return None
+            return response.json()
+        except (requests.exceptions.RequestException, ValueError):
+            self.invalidate()
+            raise
+
+    def _ping(self) -> bool:
+        self.get("")
+        return True
+
+    def _cached(self, key: str, fetch):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                return entry[1]
+        value = fetch()
+        with self._lock:
+            self._cache[key] = (now, value)
+        log.debug(f"Fetched {key} of {self.base_url}")
+        return value
@@ -0,0 +1,163 @@
+import gzip
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from . import settings as st
+from .manifest import atomic_write
+from .settings import log
+
+DB_FILE = "jobs.sqlite"  # Metadata of the stored jobs
+_JOB_ID = re.compile(r"[0-9a-f]{64}")  # Job IDs are content hashes, see manifest.digest
+
+
+class JobStore:
+    """Persistent store of the networks submitted from Cytoscape. Payloads are written gzip compressed to disk and only loaded when a job is requested, while their metadata is kept in a SQLite database. The database is shared by all worker processes of the server and survives restarts. Jobs are evicted after a time to live and, least recently used first, as soon as the payloads exceed a size limit.
+
+    path (str, optional): directory of the store. Defaults to settings.JOB_STORE_PATH.
+    ttl (float, optional): seconds after which a job is evicted. Defaults to settings.JOB_TTL.
+    max_bytes (int, optional): maximal compressed size of all payloads. Defaults to settings.JOB_STORE_MAX_BYTES.
+    """
+
+    def __init__(
+        self, path: str = None, ttl: float = None, max_bytes: int = None
+    ) -> None:
+        if path is None:
+            path = st.JOB_STORE_PATH
+        if ttl is None:
+            ttl = st.JOB_TTL
+        if max_bytes is None:
+            max_bytes = st.JOB_STORE_MAX_BYTES
+        self.path: str = path
+        self.ttl: float = ttl
+        self.max_bytes: int = max_bytes
+        os.makedirs(path, exist_ok=True)
+        with self._connect() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, created REAL, accessed REAL, size INTEGER)"
+            )
+
+    def __contains__(self, job_id: str) -> bool:
+        if not is_job_id(job_id):
+            return False
+        with self._connect() as con:
+            row = con.execute(
+                "SELECT 1 FROM jobs WHERE id = ? AND created > ?",
+                (job_id, time.time() - self.ttl),
+            ).fetchone()
+        return row is not None
+
+    def __setitem__(self, job_id: str, payload) -> None:
+        self.put(job_id, payload)
+
+    def __delitem__(self, job_id: str) -> None:
+        with self._connect() as con:
+            con.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        self._remove(job_id)
+
+    def put(self, job_id: str, payload) -> None:
+        """Stores the payload of a job and evicts old jobs. If the job already exists, its payload is kept and its time to live starts again, so that the URL of a resubmitted network stays valid.
+
+        Args:
+            job_id (str): ID of the job.
+            payload (dict): JSON serializable payload.
+
+        Raises:
+            ValueError: if job_id is not a hex digest.
+        """
+        file = self._file(job_id)
+        if job_id in self and os.path.isfile(file):
+            now = time.time()
+            with self._connect() as con:
+                con.execute(
+                    "UPDATE jobs SET created = ?, accessed = ? WHERE id = ?",
+                    (now, now, job_id),
+                )
+            return
+
+        def write(tmp):
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                json.dump(payload, f)
+
+        atomic_write(file, write)
+        now = time.time()
+        with self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?)",
+                (job_id, now, now, os.path.getsize(file)),
+            )
+        self.evict()
+
+    def get(self, job_id: str, default=None):
+        """Loads the payload of a job from disk.
+
+        Args:
+            job_id (str): ID of the job.
+            default (optional): returned if the job does not exist or expired. Defaults to None.
+
+        Returns:
+            dict: payload of the job.
+        """
+        if job_id is None or job_id not in self:
+            return default
+        try:
+            with gzip.open(self._file(job_id), "rt", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, json.decoder.JSONDecodeError) as e:
+            log.warning(f"Could not load job {job_id}: {e}")
+            return default
+        with self._connect() as con:
+            con.execute(
+                "UPDATE jobs SET accessed = ? WHERE id = ?", (time.time(), job_id)
+            )
+        return payload
+
+    def evict(self) -> None:
+        """Removes expired jobs and the least recently used ones until the payloads fit into max_bytes."""
+        with self._connect() as con:
+            expired = con.execute(
+                "SELECT id FROM jobs WHERE created <= ?", (time.time() - self.ttl,)
+            ).fetchall()
+            rows = con.execute(
+                "SELECT id, size FROM jobs WHERE created > ? ORDER BY accessed DESC",
+                (time.time() - self.ttl,),
+            ).fetchall()
+            total, evicted = 0, [job_id for job_id, in expired]
+            for idx, (job_id, size) in enumerate(rows):
+                total += size
+                # The most recently used job is always kept, even if it exceeds the limit alone.
+                if idx and total > self.max_bytes:
+                    evicted.append(job_id)
+            con.executemany("DELETE FROM jobs WHERE id = ?", [(j,) for j in evicted])
+        for job_id in evicted:
+            log.debug(f"Evicting job {job_id}")
+            self._remove(job_id)
+
+    def _file(self, job_id: str) -> str:
+        # Job IDs are user provided, keep them from escaping the store.
+        if not is_job_id(job_id):
+            raise ValueError(f"Invalid job ID {job_id!r}")
+        return os.path.join(self.path, f"{job_id}.json.gz")
+
+    def _remove(self, job_id: str) -> None:
+        try:
+            os.remove(self._file(job_id))
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def _connect(self):
+        con = sqlite3.connect(os.path.join(self.path, DB_FILE), timeout=30)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+
+def is_job_id(job_id) -> bool:
+    """Whether job_id is a valid job ID, i.e. a sha256 hex digest."""
+    return isinstance(job_id, str) and _JOB_ID.fullmatch(job_id) is not None
@@ -1,17 +1,14 @@
 import json
 import os
-from multiprocessing import Pool
 
-import matplotlib.pyplot as plt
 import networkx as nx
 import numpy
 import numpy as np
-import open3d as o3d
 import pandas as pd
-import swifter
 
 from . import settings as st
 from . import util
+from .algorithms import layout_engine
 from .classes import LayoutAlgorithms as LA
 from .classes import LinkTags as LiT
 from .classes import NodeTags as NT
@@ -145,12 +142,17 @@ class Layout:
         return self._umap_variables
 
     def calculate_layout(self):
-        if LA.cartoGRAPH in self.algo:
+        if self.algo in LA.cartoGRAPH_algos:
             self.create_cartoGRAPH_layout()
         elif LA.spring == self.algo:
             self.create_spring_layout()
         elif LA.kamada_kawai == self.algo:
             self.create_kamada_kawai_layout()
+        else:
+            engine = layout_engine(self.algo)
+            if engine is None:
+                raise ValueError(f"Unknown layout algorithm: {self.algo}")
+            self.pos = engine(self.graph, dim=self.dim, **self.variables)
 
     def normalize_pos(self):
         self.pos = normalize_pos(self.pos, dim=self.dim)
@@ -371,6 +373,9 @@ def sample_sphere_pcd(
 
     if SAMPLE_POINTS == 0:
         return numpy.array([])
+    # open3d is only needed here, import it on first use.
+    import open3d as o3d
+
     # get protein name & read mesh as .ply format
     mesh = o3d.io.read_triangle_mesh(st.SPHERE)
     mesh.compute_vertex_normals()
@@ -399,6 +404,8 @@ def visualize_layout(
     Returns:
         None: None
     """
+    import open3d as o3d
+
     pcd = o3d.geometry.PointCloud()
     pcd.points = o3d.utility.Vector3dVector(numpy.asarray(layout))
     pcd.colors = o3d.utility.Vector3dVector(numpy.asarray(colors))
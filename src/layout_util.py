@@ -3,7 +3,6 @@ import os
 import networkx as nx
 import numpy
 import numpy as np
-import open3d as o3d
 
 _WORKING_DIR = os.path.dirname(os.path.abspath(__file__))
 _THIS_EXT = os.path.join(_WORKING_DIR, "..")
@@ -31,6 +30,8 @@ def sample_sphere_pcd(
     """
     if SAMPLE_POINTS == 0:
         return numpy.array([])
+    import open3d as o3d
+
     # get protein name & read mesh as .ply format
     mesh = o3d.io.read_triangle_mesh(SPHERE)
     mesh.compute_vertex_normals()
@@ -61,6 +62,8 @@ def visualize_layout(
     Returns:
         None: None
     """
+    import open3d as o3d
+
     pcd = o3d.geometry.PointCloud()
     pcd.points = o3d.utility.Vector3dVector(numpy.asarray(layout))
     pcd.colors = o3d.utility.Vector3dVector(numpy.asarray(colors))
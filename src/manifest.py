@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from .settings import log
+
+MANIFEST_FILE = "cyex_manifest.json"  # Content hashes of the artifacts of a project
+
+
+def digest(*parts) -> str:
+    """Content hash of the inputs of an artifact. NumPy arrays are hashed by their dtype, shape and raw bytes, everything else by its JSON representation.
+
+    Returns:
+        str: hex digest of all parts.
+    """
+    sha = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            sha.update(f"{part.dtype.str}{part.shape}".encode())
+            sha.update(np.ascontiguousarray(part).data)
+        else:
+            sha.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return sha.hexdigest()
+
+
+def atomic_write(file: str, write, suffix: str = "") -> None:
+    """Writes a file atomically. The content is written to a temporary file in the same directory, which then replaces the target.
+
+    Args:
+        file (str): path of the file to write.
+        write (Callable): function which writes to the path it is given.
+        suffix (str, optional): suffix of the temporary file, e.g. the extension so that the format can be inferred from it. Defaults to "".
+    """
+    directory, name = os.path.split(file)
+    # Unique per thread, files are written concurrently by threads of the same process.
+    tmp = os.path.join(
+        directory, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp{suffix}"
+    )
+    try:
+        write(tmp)
+        os.replace(tmp, file)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+class ArtifactManifest:
+    """Content hash manifest of the artifacts of a project. Is used to skip encoding and writing artifacts whose inputs did not change since the last upload.
+
+    location (str): path to the project folder.
+    """
+
+    def __init__(self, location: str) -> None:
+        self.location: str = location
+        self.file: str = os.path.join(location, MANIFEST_FILE)
+        self.previous: dict[str, str] = {}
+        self.current: dict[str, str] = {}
+        if os.path.isfile(self.file):
+            try:
+                with open(self.file, "r") as f:
+                    self.previous = json.load(f)
+            except (OSError, json.decoder.JSONDecodeError) as e:
+                log.warning(f"Ignoring unreadable manifest {self.file}: {e}")
+
+    def begin(self) -> None:
+        """Removes the manifest from disk before artifacts are rewritten. If the upload is interrupted, the next one will regenerate everything instead of trusting outdated hashes."""
+        if os.path.isfile(self.file):
+            os.remove(self.file)
+
+    def check(self, artifacts: list[str], content: str) -> bool:
+        """Records the content hash of artifacts and checks whether they are up to date.
+
+        Args:
+            artifacts (list[str]): paths of the artifacts relative to the project folder.
+            content (str): hash of the inputs of the artifacts, see digest.
+
+        Returns:
+            bool: True if every artifact exists and was generated from the same inputs.
+        """
+        unchanged = True
+        for artifact in artifacts:
+            self.current[artifact] = content
+            if self.previous.get(artifact) != content or not os.path.isfile(
+                os.path.join(self.location, artifact)
+            ):
+                unchanged = False
+        return unchanged
+
+    def stale(self) -> list[str]:
+        """Artifacts of the previous upload which are not part of this one.
+
+        Returns:
+            list[str]: paths relative to the project folder.
+        """
+        return [a for a in self.previous if a not in self.current]
+
+    def remove_stale(self) -> None:
+        """Deletes the artifacts of the previous upload which are not part of this one."""
+        for artifact in self.stale():
+            file = os.path.join(self.location, artifact)
+            if os.path.isfile(file):
+                log.debug(f"Removing stale artifact {artifact}")
+                os.remove(file)
+
+    def save(self) -> None:
+        """Atomically writes the hashes of this upload to the project folder."""
+
+        def write(tmp):
+            with open(tmp, "w") as f:
+                json.dump(self.current, f, indent=1, sort_keys=True)
+
+        atomic_write(self.file, write)
+        self.previous = dict(self.current)
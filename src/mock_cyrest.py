@@ -0,0 +1,261 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .settings import log
+
+
+class MockCyREST:
+    """Local stand-in of the cyREST API of Cytoscape, used to test and benchmark sends without a running Cytoscape. Answers the ping and the style and visual property discovery, imports CX2 documents and fits views. The node, edge and network tables of imported networks can be read and updated and nodes and edges added and deleted. Every request is recorded and can be delayed to simulate a remote Cytoscape.
+
+    host (str, optional): address to listen on. Defaults to "127.0.0.1".
+    port (int, optional): port to listen on, 0 picks a free one. Defaults to 0.
+    latency (float, optional): seconds each request is delayed. Defaults to 0.
+    """
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 0, latency: float = 0
+    ) -> None:
+        self.latency: float = latency
+        self.networks: dict[int, list] = {}
+        self.tables: dict[int, dict[str, dict[int, dict]]] = {}
+        self.styles: list[str] = []
+        self.visual_properties: list[str] = [
+            "NODE_LABEL",
+            "NODE_SIZE",
+            "NODE_X_LOCATION",
+            "NODE_Y_LOCATION",
+            "NODE_Z_LOCATION",
+        ]
+        self.requests: list[tuple[str, str]] = []
+        self._lock = threading.Lock()
+        self._next_suid = 100
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: threading.Thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def round_trips(self) -> int:
+        """Number of requests answered since the start or the last reset."""
+        with self._lock:
+            return len(self.requests)
+
+    def reset(self) -> None:
+        """Forgets the recorded requests and imported networks."""
+        with self._lock:
+            self.requests.clear()
+            self.networks.clear()
+            self.tables.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="MockCyREST", daemon=True
+        )
+        self._thread.start()
+        log.debug(f"Mock cyREST listening on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _record(self, method: str, path: str) -> None:
+        with self._lock:
+            self.requests.append((method, path))
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _suid(self) -> int:
+        suid = self._next_suid
+        self._next_suid += 1
+        return suid
+
+    def _import(self, document: list) -> int:
+        aspects = {k: v for aspect in document for k, v in aspect.items()}
+        with self._lock:
+            suid = self._suid()
+            self.networks[suid] = document
+            nodes, edges = {}, {}
+            cx_nodes = {}
+            for node in aspects.get("nodes", []):
+                cx_nodes[node["id"]] = self._suid()
+                nodes[cx_nodes[node["id"]]] = {"SUID": cx_nodes[node["id"]], **node["v"]}
+            for edge in aspects.get("edges", []):
+                edge_suid = self._suid()
+                edges[edge_suid] = {
+                    "SUID": edge_suid,
+                    "source": cx_nodes[edge["s"]],
+                    "target": cx_nodes[edge["t"]],
+                    **edge["v"],
+                }
+            network = {suid: {"SUID": suid, **aspects["networkAttributes"][0]}}
+            self.tables[suid] = {
+                "defaultnode": nodes,
+                "defaultedge": edges,
+                "defaultnetwork": network,
+            }
+        return suid
+
+    def _add_nodes(self, suid: int, names: list[str]) -> list[dict]:
+        with self._lock:
+            nodes = self.tables[suid]["defaultnode"]
+            created = []
+            for name in names:
+                node_suid = self._suid()
+                nodes[node_suid] = {"SUID": node_suid, "name": name}
+                created.append({"name": name, "SUID": node_suid})
+        return created
+
+    def _add_edges(self, suid: int, edges: list[dict]) -> list[dict]:
+        with self._lock:
+            table = self.tables[suid]["defaultedge"]
+            nodes = self.tables[suid]["defaultnode"]
+            created = []
+            for edge in edges:
+                if edge["source"] not in nodes or edge["target"] not in nodes:
+                    raise KeyError(f"Unknown node of edge {edge}")
+                edge_suid = self._suid()
+                table[edge_suid] = {"SUID": edge_suid, **edge}
+                created.append(
+                    {"SUID": edge_suid, "source": edge["source"], "target": edge["target"]}
+                )
+        return created
+
+    def _update_table(self, suid: int, table: str, body: dict) -> None:
+        with self._lock:
+            rows = self.tables[suid][table]
+            for row in body["data"]:
+                rows[row[body["dataKey"]]].update(row)
+
+    def _delete(self, body: dict) -> None:
+        suid = int(body["network"].replace("SUID:", ""))
+        deleted = {int(n.replace("SUID:", "")) for n in body["nodeList"].split(",")}
+        with self._lock:
+            tables = self.tables[suid]
+            for node in deleted:
+                tables["defaultnode"].pop(node)
+            tables["defaultedge"] = {
+                edge_suid: edge
+                for edge_suid, edge in tables["defaultedge"].items()
+                if edge["source"] not in deleted and edge["target"] not in deleted
+            }
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, body) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._dispatch(self._get)
+
+            def _get(self):
+                url = urlparse(self.path)
+                mock._record("GET", url.path)
+                parts, network = self._route(url.path)
+                if url.path in ("/v1", "/v1/"):
+                    self._reply(200, {"apiVersion": "v1", "cytoscapeVersion": "mock"})
+                elif url.path.startswith("/v1/apply/fit/"):
+                    self._reply(200, {"data": {}, "errors": []})
+                elif url.path == "/v1/styles":
+                    self._reply(200, ["default", *mock.styles])
+                elif url.path == "/v1/styles/visualproperties":
+                    self._reply(
+                        200,
+                        [{"visualProperty": p} for p in mock.visual_properties],
+                    )
+                elif url.path == "/v1/networks":
+                    self._reply(200, list(mock.networks))
+                elif parts[:2] == ["networks", "tables"] and parts[3:] == ["rows"]:
+                    rows = mock.tables[network][parts[2]].values()
+                    self._reply(200, list(rows))
+                else:
+                    self._reply(404, {"errors": [f"Not found: {url.path}"]})
+
+            def do_POST(self):
+                self._dispatch(self._post)
+
+            def _post(self):
+                url = urlparse(self.path)
+                mock._record("POST", url.path)
+                body = self._body()
+                if body is None:
+                    return
+                query = parse_qs(url.query)
+                parts, network = self._route(url.path)
+                if url.path == "/v1/networks" and query.get("format") == ["cx2"]:
+                    self._reply(200, {"data": {"networkSUID": mock._import(body)}})
+                elif url.path == "/v1/commands/network/delete":
+                    mock._delete(body)
+                    self._reply(200, {"data": {}, "errors": []})
+                elif parts == ["networks", "nodes"]:
+                    self._reply(201, mock._add_nodes(network, body))
+                elif parts == ["networks", "edges"]:
+                    self._reply(201, mock._add_edges(network, body))
+                else:
+                    self._reply(404, {"errors": [f"Not found: {self.path}"]})
+
+            def do_PUT(self):
+                self._dispatch(self._put)
+
+            def _put(self):
+                url = urlparse(self.path)
+                mock._record("PUT", url.path)
+                body = self._body()
+                if body is None:
+                    return
+                parts, network = self._route(url.path)
+                if parts[:2] == ["networks", "tables"] and len(parts) == 3:
+                    mock._update_table(network, parts[2], body)
+                    self._reply(200, {})
+                else:
+                    self._reply(404, {"errors": [f"Not found: {self.path}"]})
+
+            def _dispatch(self, handle) -> None:
+                try:
+                    handle()
+                except KeyError as e:
+                    self._reply(404, {"errors": [f"Unknown SUID: {e}"]})
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    return json.loads(self.rfile.read(length))
+                except json.decoder.JSONDecodeError as e:
+                    self._reply(400, {"errors": [str(e)]})
+                    return None
+
+            @staticmethod
+            def _route(path: str) -> tuple[list[str], int]:
+                # /v1/networks/<suid>/<rest> is split into ["networks", *rest] and the SUID.
+                parts = path.strip("/").split("/")[1:]
+                if len(parts) > 1 and parts[0] == "networks" and parts[1].isdigit():
+                    return [parts[0], *parts[2:]], int(parts[1])
+                return parts, None
+
+        return Handler
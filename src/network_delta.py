@@ -0,0 +1,181 @@
+import json
+
+import pandas as pd
+
+from . import settings as st
+from .cx2 import POSITIONS
+from .cyrest_client import CyRESTClient
+from .progress import ProgressReporter, stage
+from .settings import log
+
+UPDATE_COLUMNS = POSITIONS + ["color", "size"]  # Node columns which change with the selected layout and color
+
+
+def network_state(
+    suid: int, nodes: pd.DataFrame, links: pd.DataFrame, node_suids: dict = None
+) -> dict:
+    """State of a network in Cytoscape, which is needed to update it later on.
+
+    Args:
+        suid (int): SUID of the network.
+        nodes (pd.DataFrame): sent nodes, see extract_node_data.
+        links (pd.DataFrame): sent links, see extract_link_data.
+        node_suids (dict, optional): SUID of each node by its id column. If None, it is fetched from Cytoscape by the first update. Defaults to None.
+
+    Returns:
+        dict: state of the network.
+    """
+    return {
+        "suid": int(suid),
+        "nodes": dict(zip(nodes.index.tolist(), nodes["id"].astype(str).tolist())),
+        "links": dict(
+            zip(
+                links.index.tolist(),
+                zip(
+                    pd.to_numeric(links["source"]).tolist(),
+                    pd.to_numeric(links["target"]).tolist(),
+                ),
+            )
+        ),
+        "node_suids": node_suids,
+    }
+
+
+def can_update(client: CyRESTClient, previous: dict, nodes: pd.DataFrame) -> bool:
+    """Whether a previously sent network should be updated instead of creating a new one. This is the case if it still exists in Cytoscape and the selection did not change too much.
+
+    Args:
+        client (CyRESTClient): client of the Cytoscape host.
+        previous (dict): state of the previously sent network, see network_state. Might be None.
+        nodes (pd.DataFrame): nodes to send.
+
+    Returns:
+        bool: True if the network should be updated.
+    """
+    if previous is None:
+        return False
+    changed = len(set(previous["nodes"]).symmetric_difference(nodes.index.tolist()))
+    if changed > st.SEND_DELTA_MAX_CHANGE * max(len(nodes), 1):
+        return False
+    return previous["suid"] in client.get("networks")
+
+
+def node_suids(client: CyRESTClient, suid: int) -> dict[str, int]:
+    """Fetches the SUID of each node of a network.
+
+    Args:
+        client (CyRESTClient): client of the Cytoscape host.
+        suid (int): SUID of the network.
+
+    Returns:
+        dict[str, int]: SUID of each node by its id column.
+    """
+    rows = client.get(f"networks/{suid}/tables/defaultnode/rows")
+    return {str(row["id"]): int(row["SUID"]) for row in rows if "id" in row}
+
+
+def _records(df: pd.DataFrame, suids: list[int]) -> list[dict]:
+    records = json.loads(df.to_json(orient="records"))
+    for record, suid in zip(records, suids):
+        record["SUID"] = suid
+    return records
+
+
+def _update_table(client: CyRESTClient, suid: int, table: str, rows: list[dict]):
+    if rows:
+        client.put(
+            f"networks/{suid}/tables/{table}",
+            {"key": "SUID", "dataKey": "SUID", "data": rows},
+        )
+
+
+def update_network(
+    client: CyRESTClient,
+    previous: dict,
+    nodes: pd.DataFrame,
+    links: pd.DataFrame,
+    title: str,
+    progress: ProgressReporter = None,
+) -> dict:
+    """Updates a previously sent network in place. Only the nodes and links which are no longer or newly selected are removed or added. The positions, colors and sizes of all nodes are updated with a single request.
+
+    Args:
+        client (CyRESTClient): client of the Cytoscape host.
+        previous (dict): state of the network, see network_state.
+        nodes (pd.DataFrame): nodes to send, see extract_node_data.
+        links (pd.DataFrame): links to send, see extract_link_data.
+        title (str): name of the network.
+        progress (ProgressReporter, optional): reports the stages "network" and "fit". Defaults to None.
+
+    Raises:
+        requests.exceptions.RequestException: if cyREST rejected a request.
+        KeyError: if a node of the network is no longer known to Cytoscape.
+        ValueError: if links between kept nodes were deselected, which can not be removed by the update.
+
+    Returns:
+        dict: updated state of the network.
+    """
+    suid = previous["suid"]
+    stage(progress, "network")
+    suids = dict(previous["node_suids"] or node_suids(client, suid))
+    ids = nodes["id"].astype(str)
+    selected = set(nodes.index.tolist())
+
+    sent_links = set(links.index.tolist())
+    if any(
+        link not in sent_links and s in selected and t in selected
+        for link, (s, t) in previous["links"].items()
+    ):
+        raise ValueError("Deselected links can not be removed from the network.")
+    removed = [i for i in previous["nodes"] if i not in selected]
+
+    if removed:
+        # Removing a node removes its links as well.
+        node_list = ",".join(f"SUID:{suids.pop(previous['nodes'][i])}" for i in removed)
+        client.post(
+            "commands/network/delete",
+            {"network": f"SUID:{suid}", "nodeList": node_list},
+        )
+
+    added = ~nodes.index.isin(list(previous["nodes"]))
+    if added.any():
+        names = nodes.loc[added, "name"].tolist()
+        created = client.post(f"networks/{suid}/nodes", names)
+        for node_id, node in zip(ids[added].tolist(), created):
+            suids[node_id] = int(node["SUID"])
+
+    kept = nodes.loc[~added, [c for c in UPDATE_COLUMNS if c in nodes.columns]]
+    rows = _records(kept, [suids[i] for i in ids[~added]])
+    rows += _records(nodes.loc[added], [suids[i] for i in ids[added]])
+    _update_table(client, suid, "defaultnode", rows)
+
+    new_links = links[~links.index.isin(list(previous["links"]))]
+    if len(new_links):
+        id_of = dict(zip(nodes.index.astype(str).tolist(), ids.tolist()))
+        edges = [
+            {
+                "source": suids[id_of[s]],
+                "target": suids[id_of[t]],
+                "directed": False,
+                "interaction": i,
+            }
+            for s, t, i in zip(
+                new_links["source"], new_links["target"], new_links["interaction"]
+            )
+        ]
+        created = client.post(f"networks/{suid}/edges", edges)
+        attributes = new_links.drop(columns=["source", "target"])
+        _update_table(
+            client,
+            suid,
+            "defaultedge",
+            _records(attributes, [int(edge["SUID"]) for edge in created]),
+        )
+
+    _update_table(client, suid, "defaultnetwork", [{"SUID": suid, "name": title}])
+    log.debug(
+        f"Updated network {suid}: {added.sum()} nodes added, {len(removed)} removed, {len(new_links)} links added"
+    )
+    stage(progress, "fit")
+    client.get(f"apply/fit/{suid}")
+    return network_state(suid, nodes, links, suids)
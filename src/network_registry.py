@@ -0,0 +1,63 @@
+import threading
+from collections import OrderedDict
+
+from . import settings as st
+
+
+class NetworkRegistry:
+    """Networks which the sends of each client created in Cytoscape. Lives in the server process, the state of a network is passed to the send worker and the updated state is returned with the status of the send. The least recently sent networks are forgotten as soon as more than max_networks are known.
+
+    max_networks (int, optional): maximal number of remembered networks. Defaults to settings.SENT_NETWORKS_MAX.
+    """
+
+    def __init__(self, max_networks: int = None) -> None:
+        if max_networks is None:
+            max_networks = st.SENT_NETWORKS_MAX
+        self.max_networks: int = max_networks
+        self._networks: OrderedDict[tuple, dict] = OrderedDict()
+        self._sending: set[tuple] = set()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> dict or None:
+        with self._lock:
+            return self._networks.get(key)
+
+    def put(self, key: tuple, network: dict) -> None:
+        with self._lock:
+            self._networks[key] = network
+            self._networks.move_to_end(key)
+            while len(self._networks) > self.max_networks:
+                self._networks.popitem(last=False)
+
+    def drop(self, key: tuple) -> None:
+        with self._lock:
+            self._networks.pop(key, None)
+
+    def acquire(self, key: tuple) -> tuple[bool, dict or None]:
+        """Marks the network of a key as in use by a send, so that two sends do not update the same network in Cytoscape at the same time. Each successful acquire has to be followed by a release.
+
+        Args:
+            key (tuple): key of the network.
+
+        Returns:
+            tuple[bool, dict or None]: False if another send of the key is running, otherwise True and the state of the network, None if it is unknown.
+        """
+        with self._lock:
+            if key in self._sending:
+                return False, None
+            self._sending.add(key)
+            return True, self._networks.get(key)
+
+    def release(self, key: tuple, network: dict = None) -> None:
+        """Stores the state of the network after a send and allows the next send of the key.
+
+        Args:
+            key (tuple): key of the network.
+            network (dict, optional): state of the network, the network is forgotten if None. Defaults to None.
+        """
+        if network is None:
+            self.drop(key)
+        else:
+            self.put(key, network)
+        with self._lock:
+            self._sending.discard(key)
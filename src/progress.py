@@ -0,0 +1,90 @@
+import threading
+import time
+
+from .settings import log
+
+
+class ProgressReporter:
+    """Publishes structured progress events of a pipeline. A pipeline is split into stages, e.g. "layouts" or "textures", and each stage reports how many of its items are done. The ETA of a stage is derived from the throughput measured since the stage started. Events within a stage are throttled to one per min_interval seconds, the start and the end of a stage are always published.
+
+    notify (Callable, optional): called with every event. Defaults to None.
+    min_interval (float, optional): minimal number of seconds between two events of a stage. Defaults to 0.5.
+    """
+
+    def __init__(self, notify=None, min_interval: float = 0.5) -> None:
+        self.min_interval: float = min_interval
+        self.event: dict = None
+        self._notify = notify
+        self._lock = threading.Lock()
+        self._stage: str = None
+        self._total: int = None
+        self._done: int = 0
+        self._unit: str = None
+        self._started: float = None
+        self._last: float = 0
+
+    def stage(self, name: str, total: int = None, unit: str = "items") -> None:
+        """Starts a new stage.
+
+        Args:
+            name (str): name of the stage.
+            total (int, optional): number of items of the stage, if known. Defaults to None.
+            unit (str, optional): what the items are, e.g. "layouts". Defaults to "items".
+        """
+        with self._lock:
+            self._stage, self._total, self._unit = name, total, unit
+            self._done = 0
+            self._started = time.perf_counter()
+        self._publish(force=True)
+
+    def advance(self, items: int = 1, **info) -> None:
+        """Reports that items of the current stage are done.
+
+        Args:
+            items (int, optional): number of finished items. Defaults to 1.
+            info: additional fields of the event, e.g. layout="spring".
+        """
+        with self._lock:
+            self._done += items
+            finished = self._total is not None and self._done >= self._total
+        self._publish(force=finished or bool(info), **info)
+
+    def _publish(self, force: bool = False, **info) -> None:
+        with self._lock:
+            now = time.perf_counter()
+            if not force and now - self._last < self.min_interval:
+                return
+            self._last = now
+            elapsed = now - self._started
+            eta = None
+            if self._total is not None and self._done:
+                # Remaining items at the throughput measured so far
+                eta = (self._total - self._done) * elapsed / self._done
+            self.event = {
+                "stage": self._stage,
+                "done": self._done,
+                "total": self._total,
+                "unit": self._unit,
+                "elapsed": round(elapsed, 3),
+                "eta": None if eta is None else round(eta, 3),
+                **info,
+            }
+            event = self.event
+        if self._notify is None:
+            return
+        try:
+            self._notify(event)
+        except Exception as e:
+            log.warning(f"Could not report progress: {e}")
+
+
+def stage(progress: ProgressReporter or None, *args, **kwargs) -> None:
+    """Starts a stage if a reporter is given, see ProgressReporter.stage."""
+    if progress is not None:
+        progress.stage(*args, **kwargs)
+
+
+def advance(progress: ProgressReporter or None, *args, **kwargs) -> None:
+    """Advances the current stage if a reporter is given, see ProgressReporter.advance."""
+    if progress is not None:
+        progress.advance(*args, **kwargs)
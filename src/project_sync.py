@@ -0,0 +1,299 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ModuleNotFoundError:  # Windows
+    fcntl = None
+
+from . import settings as st
+from .manifest import atomic_write
+from .settings import log
+
+SYNC_MANIFEST_FILE = "cyex_sync.json"  # Bundled files a project was synced from
+_FICLONE = 0x40049409  # ioctl which reflinks a file on Linux
+SYNC_STAGING_DIR = ".cyex_sync"  # Folder next to the projects directory in which new projects are assembled
+_HASH_BLOCK = 1024**2
+
+
+def file_digest(path: str) -> str:
+    """Content hash of a file.
+
+    Args:
+        path (str): path of the file.
+
+    Returns:
+        str: hex digest of the file.
+    """
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _reflink(source: str, target: str) -> bool:
+    if fcntl is None:
+        return False
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            cloned = True
+        except OSError:
+            cloned = False
+    if not cloned:
+        os.remove(target)
+        return False
+    shutil.copystat(source, target)
+    return True
+
+
+def place_file(source: str, target: str) -> str:
+    """Places a copy of a bundled file. The file is reflinked if the file system supports it, hard linked if settings.PROJECT_SYNC_HARDLINK allows it and copied otherwise.
+
+    Args:
+        source (str): path of the bundled file.
+        target (str): path of the copy, must not exist.
+
+    Returns:
+        str: how the file was placed, "reflink", "link" or "copy".
+    """
+    if _reflink(source, target):
+        return "reflink"
+    if st.PROJECT_SYNC_HARDLINK:
+        try:
+            os.link(source, target)
+            return "link"
+        except OSError:
+            pass
+    shutil.copy2(source, target)
+    return "copy"
+
+
+def _scan(directory: str) -> dict[str, os.stat_result]:
+    files = {}
+    stack = [directory]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    rel = os.path.relpath(entry.path, directory).replace(os.sep, "/")
+                    if rel != SYNC_MANIFEST_FILE:
+                        files[rel] = entry.stat()
+    return files
+
+
+def _read_manifest(location: str) -> dict[str, dict] or None:
+    file = os.path.join(location, SYNC_MANIFEST_FILE)
+    if not os.path.isfile(file):
+        return None
+    try:
+        with open(file, "r") as f:
+            return json.load(f)
+    except (OSError, json.decoder.JSONDecodeError) as e:
+        log.warning(f"Ignoring unreadable sync manifest {file}: {e}")
+        return {}
+
+
+def _sync_file(
+    source: str, target: str, rel: str, stat: os.stat_result, previous: dict
+) -> tuple[dict, str or None]:
+    entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+    if (
+        previous.get("size") == stat.st_size
+        and previous.get("mtime") == stat.st_mtime_ns
+    ):
+        # Unchanged since the last sync, the hash is not computed again.
+        entry["sha256"] = previous.get("sha256")
+    else:
+        entry["sha256"] = file_digest(os.path.join(source, rel))
+    file = os.path.join(target, *rel.split("/"))
+    if entry["sha256"] == previous.get("sha256") and os.path.isfile(file):
+        return entry, None
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+    placed = []
+    atomic_write(
+        file, lambda tmp: placed.append(place_file(os.path.join(source, rel), tmp))
+    )
+    return entry, placed[0]
+
+
+def sync_project(
+    source: str, target: str, executor: ThreadPoolExecutor, staging: str = None
+) -> dict:
+    """Syncs a bundled project into the projects directory. Only files which were added or changed since the last sync are placed, files removed from the bundle are removed from the project. The hash of every synced file is kept in the manifest SYNC_MANIFEST_FILE of the project, a file is only hashed again if its size or modification time changed. A new project is assembled outside the projects directory and moved in place once complete, so that the VRNetzer never lists a partially copied project.
+
+    Args:
+        source (str): folder of the bundled project.
+        target (str): folder of the project in the projects directory.
+        executor (ThreadPoolExecutor): threads hashing and placing the files.
+        staging (str, optional): folder in which a new project is assembled, has to be on the file system of the projects directory. Defaults to the staging_dir of the projects directory.
+
+    Returns:
+        dict: number of files placed by each method, the "unchanged" and "removed" files.
+    """
+    counts = {"unchanged": 0, "removed": 0}
+    previous = _read_manifest(target)
+    if previous is None and os.path.isdir(target):
+        # Copied before the manifest existed or created by the user, do not touch it.
+        log.debug(f"Not syncing {target}, it has no sync manifest.")
+        return counts
+    previous = previous or {}
+    location = target
+    if not os.path.isdir(target):
+        if staging is None:
+            staging = staging_dir(os.path.dirname(target))
+        location = os.path.join(staging, f"{os.path.basename(target)}.{os.getpid()}")
+        shutil.rmtree(location, ignore_errors=True)
+        os.makedirs(location)
+
+    files = _scan(source)
+    futures = {
+        rel: executor.submit(
+            _sync_file, source, location, rel, stat, previous.get(rel, {})
+        )
+        for rel, stat in files.items()
+    }
+    current = {}
+    for rel, future in futures.items():
+        current[rel], method = future.result()
+        key = method or "unchanged"
+        counts[key] = counts.get(key, 0) + 1
+    for rel in previous:
+        file = os.path.join(location, *rel.split("/"))
+        if rel not in current and os.path.isfile(file):
+            os.remove(file)
+            counts["removed"] += 1
+
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(current, f, indent=1, sort_keys=True)
+
+    atomic_write(os.path.join(location, SYNC_MANIFEST_FILE), write)
+    if location != target:
+        try:
+            os.replace(location, target)
+        except OSError:
+            shutil.rmtree(location, ignore_errors=True)
+            # Only expected if another process synced the project in the meantime.
+            if not os.path.isdir(target):
+                raise
+    return counts
+
+
+def staging_dir(projects: str) -> str:
+    """Folder in which new projects are assembled. It lies next to the projects directory, so that the projects can be moved in place without copying, but is not listed as a project.
+
+    Args:
+        projects (str): projects directory.
+
+    Returns:
+        str: path of the folder.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(projects)), SYNC_STAGING_DIR)
+
+
+def remove_staging(staging: str) -> int:
+    """Removes the projects which an earlier sync was assembling when it was interrupted, e.g. by stopping the server. Projects assembled by syncs of other running processes are kept.
+
+    Args:
+        staging (str): folder in which the projects are assembled, see staging_dir.
+
+    Returns:
+        int: number of removed projects.
+    """
+    removed = 0
+    if not os.path.isdir(staging):
+        return removed
+    for name in os.listdir(staging):
+        pid = name.rpartition(".")[2]
+        if pid.isdigit() and int(pid) != os.getpid() and _running(int(pid)):
+            continue
+        shutil.rmtree(os.path.join(staging, name), ignore_errors=True)
+        removed += 1
+    return removed
+
+
+def _running(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill would terminate the process on Windows.
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists, but belongs to another user.
+        return True
+    return True
+
+
+def sync_projects(
+    source: str = None, target: str = None, threads: int = None
+) -> dict:
+    """Syncs every bundled project into the projects directory, see sync_project. Leftovers of interrupted syncs are removed first, see remove_staging.
+
+    Args:
+        source (str, optional): folder of the bundled projects. Defaults to the projects of the static folder of this extension.
+        target (str, optional): projects directory. Defaults to the projects directory of the VRNetzer.
+        threads (int, optional): threads hashing and placing files. Defaults to settings.PROJECT_SYNC_THREADS.
+
+    Returns:
+        dict: counts of each synced project, see sync_project.
+    """
+    if source is None:
+        source = os.path.join(st._THIS_EXT_STATIC_PATH, "projects")
+    if target is None:
+        target = st._PROJECTS_PATH
+    if threads is None:
+        threads = st.PROJECT_SYNC_THREADS
+    if not os.path.isdir(source):
+        return {}
+    start = time.perf_counter()
+    staging = staging_dir(target)
+    removed = remove_staging(staging)
+    if removed:
+        log.debug(f"Removed {removed} folders of interrupted syncs.")
+    results = {}
+    with ThreadPoolExecutor(
+        max(1, threads), thread_name_prefix="ProjectSync"
+    ) as executor:
+        for name in sorted(os.listdir(source)):
+            if name.startswith(".") or not os.path.isdir(os.path.join(source, name)):
+                continue
+            try:
+                results[name] = sync_project(
+                    os.path.join(source, name),
+                    os.path.join(target, name),
+                    executor,
+                    staging,
+                )
+            except OSError as e:
+                log.error(f"Could not sync project {name}: {e}")
+                continue
+            log.debug(f"Synced project {name}: {results[name]}")
+    log.info(
+        f"Synced {len(results)} bundled projects in {time.perf_counter() - start:.2f}s",
+        runtime=True,
+    )
+    return results
+
+
+def sync_in_background(**kwargs) -> threading.Thread:
+    """Runs sync_projects on a daemon thread, so that the server can handle requests while the projects are synced.
+
+    Returns:
+        threading.Thread: the started thread.
+    """
+    thread = threading.Thread(
+        target=sync_projects, kwargs=kwargs, name="ProjectSync", daemon=True
+    )
+    thread.start()
+    return thread
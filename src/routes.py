@@ -7,14 +7,21 @@ import flask
 from . import settings as st
 from . import util as my_util
 from .classes import VRNetzElements as VRNE
-from .cyEx_project import CyExProject
+from .manifest import digest
 from .settings import log
-from .uploader import Uploader
+from .upload_jobs import UploadJob, UploadQueue, estimate_memory
 
 
-def upload_vrnetz(network=None):
+def upload_vrnetz(upload_queue: UploadQueue, network=None):
     """Use the submitted file to create a VRNetzer project.
-    Submitted file is a VRNetz file. The file is parsed and the project is created. Reports if VRNetz file is missing or if its wrongly formatted.
+    Submitted file is a VRNetz file. The file is parsed and the upload is queued. Reports if VRNetz file is missing or if its wrongly formatted.
+
+    Args:
+        upload_queue (UploadQueue): queue which runs the upload in the background.
+        network (dict, optional): network submitted from Cytoscape. If None, the network is read from the uploaded VRNetz file. Defaults to None.
+
+    Returns:
+        flask.Response or str: ID of the queued upload or an error message.
     """
 
     ### Initialization
@@ -32,11 +39,51 @@ def upload_vrnetz(network=None):
             st.log.error(f"Invalid VRNetz file:{network_file.filename}")
             return '<a style="color:red;">ERROR invalid VRNetz file!</a>'
     project_name = form["CyEx_project_name"]
-    project = CyExProject(project_name, network)
+    st.log.debug(form)
+    layouts = parse_layouts(form)
+
+    n_nodes = len(network.get(VRNE.nodes, []))
+    n_links = len(network.get(VRNE.links, []))
+    memory = estimate_memory(
+        n_nodes, n_links, len(layouts) + len(network.get(VRNE.node_layouts, []))
+    )
+    # Identifies repeated uploads of the same network with the same layout settings.
+    content = digest(network, layouts)
+    previous = upload_queue.find(content, project_name)
+    if previous is not None and not previous.done:
+        log.info(f"Identical upload to {project_name} is already queued.")
+        return flask.jsonify(previous.to_dict())
+    if previous is not None and os.path.isdir(previous.location or ""):
+        # Layouts are not seeded, uploading again would only calculate different positions.
+        log.info(f"Identical upload to {project_name} is already finished.")
+        return flask.jsonify(previous.to_dict())
 
-    ## Prepare layout information
+    # Small uploads are started before large ones, uploads of the same size class in order of submission.
+    priority = (n_nodes + n_links).bit_length()
+    job = upload_queue.submit(
+        run_upload,
+        network,
+        project_name,
+        layouts,
+        priority=priority,
+        memory=memory,
+        key=content,
+        project=project_name,
+    )
+    return flask.jsonify(job.to_dict())
+
+
+def parse_layouts(form: dict) -> list[tuple[str, str, dict]]:
+    """Prepare layout information of the upload form.
+
+    Args:
+        form (dict): submitted upload form.
+
+    Returns:
+        list[tuple[str, str, dict]]: name, algorithm and variables of every requested layout.
+    """
+    layouts = []
     i = 1
-    st.log.debug(form)
     while True:
         name = f"layout_{i}_name"
         algo = f"layout_{i}_algo"
@@ -62,19 +109,49 @@ def upload_vrnetz(network=None):
         variables["iterations"] = int(variables["iterations"])
         variables["steps"] = int(variables["steps"])
         variables["n_neighbors"] = int(variables["n_neighbors"])
+        layouts.append((layout_name, algo, variables))
+        i += 1
+    return layouts
+
+
+def run_upload(
+    job: UploadJob,
+    network: dict,
+    project_name: str,
+    layouts: list[tuple[str, str, dict]],
+) -> str:
+    """Creates the project, calculates its layouts and uploads it. Runs on a worker of the upload queue.
+
+    Args:
+        job (UploadJob): job of the upload, used to report its stage. Its processes attribute limits the worker processes of the upload.
+        network (dict): VRNetz network.
+        project_name (str): name of the project.
+        layouts (list[tuple[str, str, dict]]): name, algorithm and variables of every layout, see parse_layouts.
+
+    Returns:
+        str: Status message shown to the user.
+    """
+    # The upload pipeline pulls in pandas and networkx, the server only imports it with the first upload.
+    from .cyEx_project import CyExProject
+    from .uploader import Uploader
+
+    s1 = time.time()
+    job.set_stage("parsing")
+    project = CyExProject(project_name, network)
+    for layout_name, algo, variables in layouts:
         project.add_layout(
             layout_name,
             algo,
             variables,
         )
-        i += 1
 
-    project.calculate_layouts()
+    project.calculate_layouts(progress=job.progress)
 
     uploader = Uploader(project)
-    s1 = time.time()
-    state = uploader.upload_files()
-    log.debug(f"Uploading process took {time.time()-s1} seconds.")
+    s2 = time.time()
+    state = uploader.upload_files(processes=job.processes, progress=job.progress)
+    job.location = project.location
+    log.debug(f"Uploading process took {time.time()-s2} seconds.")
     log.info(f"Uploading network...", flush=True)
 
     ## TODO: Not sure if necessary, was nice for debugging
@@ -0,0 +1,327 @@
+import multiprocessing as mp
+import os
+import signal
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from . import settings as st
+from .progress import ProgressReporter
+from .settings import log
+
+# Shared with the workers by the pool initializer.
+_events: mp.Queue = None
+_cancelled = None
+
+
+class SendCancelled(Exception):
+    """Raised on a worker when the client cancelled the running send."""
+
+
+class SendProgress(ProgressReporter):
+    """Progress of a send on a worker. Every event is put on the event queue of the pool. A new stage is only started if the send was not cancelled, so that a cancelled send stops at the next stage.
+
+    send_id (str): ID of the send.
+    slot (int): index of the cancel flag of the send.
+    """
+
+    def __init__(self, send_id: str, slot: int) -> None:
+        super().__init__(self._put, min_interval=0)
+        self.send_id: str = send_id
+        self.slot: int = slot
+
+    def stage(self, name: str, total: int = None, unit: str = "items") -> None:
+        if _cancelled[self.slot]:
+            raise SendCancelled(self.send_id)
+        super().stage(name, total, unit)
+
+    def _put(self, event: dict) -> None:
+        _events.put({"id": self.send_id, **event})
+
+
+def _warm_up(events: mp.Queue, cancelled) -> None:
+    """Pool initializer. Stores the event queue and the cancel flags, reports the pid of the worker and imports the send pipeline once per worker, so that a send does not pay for importing pandas and requests."""
+    global _events, _cancelled
+    _events, _cancelled = events, cancelled
+    events.put({"worker": os.getpid()})
+    from . import send_to_cytoscape  # noqa: F401
+
+
+def send_network(*args, progress: ProgressReporter = None) -> dict:
+    """Sends a network on a worker, see send_to_cytoscape.send_to_cytoscape. Submit this instead of send_to_cytoscape, so that the send pipeline is only imported by the workers and not by the server process.
+
+    Returns:
+        dict: status of the send.
+    """
+    from .send_to_cytoscape import send_to_cytoscape
+
+    return send_to_cytoscape(*args, progress=progress)
+
+
+def _ready() -> bool:
+    return True
+
+
+def _run(func, send_id: str, slot: int, *args) -> dict:
+    try:
+        return func(*args, progress=SendProgress(send_id, slot))
+    except SendCancelled:
+        return {"message": "The send was cancelled.", "status": "cancelled"}
+
+
+class SendJob:
+    """A send submitted to the SendPool.
+
+    send_id (str): ID of the send.
+    slot (int): index of the cancel flag of the send.
+    func (Callable): function which sends the network, see SendPool.submit.
+    args (tuple): arguments of func.
+    notify (Callable, optional): called with every progress event and the final status of the send. Defaults to None.
+    owner (str, optional): client which submitted the send. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        send_id: str,
+        slot: int,
+        func,
+        args: tuple,
+        notify=None,
+        owner: str = None,
+    ) -> None:
+        self.id: str = send_id
+        self.slot: int = slot
+        self.func = func
+        self.args: tuple = args
+        self.owner: str = owner
+        self.future: Future = None
+        self.pool: ProcessPoolExecutor = None
+        self.timer: threading.Timer = None
+        self.timed_out: bool = False
+        # Set when the workers are restarted because another send timed out.
+        self.interrupted: bool = False
+        self.resubmit: bool = False
+        self._notify = notify
+
+    def notify(self, event: dict) -> None:
+        if self._notify is None:
+            return
+        try:
+            self._notify({"id": self.id, **event})
+        except Exception as e:
+            log.warning(f"Could not report state of send {self.id}: {e}")
+
+
+class SendPool:
+    """Long-lived pool of worker processes which send networks to Cytoscape. Sends are submitted without waiting for them, several sends run in parallel and only their arguments, progress events and the resulting status are passed between the processes. The workers are started and warmed up with the first send, so that the server does not start processes which import the send pipeline before a network is sent.
+
+    If a send times out, its worker can not be stopped and all workers are restarted. Sends waiting in the queue are moved to the new workers, sends running on the old workers fail with a status saying so.
+
+    workers (int, optional): number of worker processes. Defaults to settings.SEND_WORKERS.
+    timeout (float, optional): seconds until a send is aborted. Defaults to settings.SEND_TIMEOUT.
+    max_pending (int, optional): number of sends which can be queued or running at the same time. Defaults to settings.SEND_MAX_PENDING.
+    """
+
+    def __init__(
+        self, workers: int = None, timeout: float = None, max_pending: int = None
+    ) -> None:
+        if workers is None:
+            workers = st.SEND_WORKERS
+        if timeout is None:
+            timeout = st.SEND_TIMEOUT
+        if max_pending is None:
+            max_pending = st.SEND_MAX_PENDING
+        self.workers: int = max(1, workers)
+        self.timeout: float = timeout
+        self.max_pending: int = max(1, max_pending)
+        # Reentrant, cancelling futures runs their callbacks right away.
+        self._lock = threading.RLock()
+        self._sends: dict[str, SendJob] = {}
+        self._free: list[int] = list(range(self.max_pending))
+        self._context = mp.get_context(st.WORKER_START_METHOD)
+        self._cancelled = None
+        self._events: mp.Queue = None
+        self._pool: ProcessPoolExecutor = None
+        self._pids: set[int] = None
+
+    def submit(self, func, *args, notify=None, owner: str = None) -> dict:
+        """Queues a send and returns without waiting for it.
+
+        Args:
+            func (Callable): module level function which sends the network. Is called with the keyword progress, a SendProgress, and returns the status of the send.
+            notify (Callable, optional): called with every progress event and the final status of the send, both contain its "id". Defaults to None.
+            owner (str, optional): client which submits the send, only it can cancel the send. Defaults to None.
+
+        Returns:
+            dict: state of the send with the keys "id", "message" and "status".
+        """
+        with self._lock:
+            if not self._free:
+                return {
+                    "id": None,
+                    "message": "Too many networks are being sent to Cytoscape. Please try again later.",
+                    "status": "error",
+                }
+            if self._pool is None:
+                self._cancelled = self._context.Array("b", self.max_pending)
+                self._start()
+            job = SendJob(uuid.uuid4().hex, self._free.pop(), func, args, notify, owner)
+            self._cancelled[job.slot] = 0
+            self._sends[job.id] = job
+            job.timer = threading.Timer(self.timeout, self._expire, (job,))
+            job.timer.daemon = True
+            if not self._submit(job):
+                self._release(job)
+                return {
+                    "id": None,
+                    "message": "The send process was aborted. Please try again.",
+                    "status": "error",
+                }
+        job.timer.start()
+        return {"id": job.id, "message": "Send queued.", "status": "queued"}
+
+    def cancel(self, send_id: str, owner: str = None) -> bool:
+        """Cancels a send. A queued send is dropped, a running send stops at its next stage.
+
+        Args:
+            send_id (str): ID returned by submit.
+            owner (str, optional): client which requests the cancel. If given, only sends submitted by it are cancelled. Defaults to None.
+
+        Returns:
+            bool: False if the send is unknown, belongs to another client or already finished.
+        """
+        with self._lock:
+            job = self._sends.get(send_id)
+            if job is None or (owner is not None and job.owner != owner):
+                return False
+            job.resubmit = False
+            if not job.future.cancel():
+                self._cancelled[job.slot] = 1
+        log.debug(f"Cancelled send {send_id}")
+        return True
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is None:
+                return
+            self._pool.shutdown(wait=True)
+            self._events.put(None)
+
+    def _submit(self, job: SendJob) -> bool:
+        job.pool = self._pool
+        try:
+            job.future = job.pool.submit(_run, job.func, job.id, job.slot, *job.args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            log.error(f"Could not submit send: {e}")
+            return False
+        job.future.add_done_callback(lambda future: self._finish(job))
+        return True
+
+    def _finish(self, job: SendJob) -> None:
+        future = job.future
+        if future.cancelled() and job.resubmit:
+            # Was still queued when the workers were restarted, it runs on the new ones.
+            job.resubmit = False
+            with self._lock:
+                if self._submit(job):
+                    log.debug(f"Moved send {job.id} to the restarted workers.")
+                    return
+        job.timer.cancel()
+        if job.timed_out:
+            status = {
+                "message": f"Process timed out. Please do not remove networks or views fom Cytoscape while the process is running.",
+                "status": "error",
+            }
+        elif future.cancelled():
+            status = {"message": "The send was cancelled.", "status": "cancelled"}
+        elif future.exception() is not None and job.interrupted:
+            status = {
+                "message": "The send was aborted, because the send workers were restarted after another send timed out. Please try again.",
+                "status": "error",
+            }
+        elif future.exception() is not None:
+            log.error(f"Send worker failed: {future.exception()}")
+            status = {
+                "message": "The send process was aborted. Please try again.",
+                "status": "error",
+            }
+        else:
+            status = future.result()
+        with self._lock:
+            self._release(job)
+        job.notify(status)
+
+    def _release(self, job: SendJob) -> None:
+        if self._sends.pop(job.id, None) is not None:
+            self._free.append(job.slot)
+
+    def _expire(self, job: SendJob) -> None:
+        with self._lock:
+            if job.future.done():
+                return
+            job.timed_out = True
+            job.resubmit = False
+            if job.future.cancel():
+                # Still waiting for a worker, nothing to restart.
+                return
+        log.warning("Send to Cytoscape timed out, restarting the send workers.")
+        self._restart(job.pool)
+
+    def _listen(self, events: mp.Queue, pids: set[int]) -> None:
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            if "worker" in event:
+                with self._lock:
+                    pids.add(event["worker"])
+                continue
+            with self._lock:
+                job = self._sends.get(event["id"])
+            if job is not None:
+                job.notify(event)
+
+    def _start(self) -> None:
+        # A worker terminated while writing could leave the queue unusable, every pool gets its own.
+        self._events = self._context.Queue()
+        self._pids = set()
+        threading.Thread(
+            target=self._listen,
+            args=(self._events, self._pids),
+            name="SendEvents",
+            daemon=True,
+        ).start()
+        self._pool = ProcessPoolExecutor(
+            self.workers,
+            mp_context=self._context,
+            initializer=_warm_up,
+            initargs=(self._events, self._cancelled),
+        )
+        # Workers are spawned on demand, start all of them right away.
+        for _ in range(self.workers):
+            self._pool.submit(_ready)
+
+    def _restart(self, pool: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if pool is not self._pool:
+                # Already restarted by another send.
+                return
+            events, pids = self._events, self._pids
+            for job in self._sends.values():
+                if job.pool is not pool or job.timed_out:
+                    continue
+                if job.future.running():
+                    job.interrupted = True
+                else:
+                    job.resubmit = True
+            self._start()
+            # Queued sends are cancelled and resubmitted to the new pool by _finish.
+            pool.shutdown(wait=False, cancel_futures=True)
+            # A hanging worker can not be cancelled, terminate the processes of the old pool.
+            for pid in pids:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+            events.put(None)
@@ -2,39 +2,50 @@ __updated__ = "2023-11-21 16:45:12"
 import json
 import os
 import random
+import sys
 
 import GlobalData as GD
+import numpy as np
 import pandas as pd
-import py4cytoscape as p4c
 import requests
-import swifter
-from PIL import Image
 from project import Project
 
 from . import settings as st
+from . import sidecar
 from . import util as string_util
 from .classes import NodeTags as NT
+from .cx2 import STYLE, build_cx2, push_cx2
+from .cyrest_client import CyRESTClient, get_client
+from .network_delta import can_update, network_state, update_network
+from .progress import ProgressReporter, stage
+from .send_pool import SendCancelled
+from .texture_cache import load_pixels
+from .textures import decode_positions
+
+# Two digit hex strings of every byte value.
+_HEX = np.array([f"{i:02x}" for i in range(256)])
 
 
 def send_to_cytoscape(
     ip: str,
-    return_dict: dict,
     pdata: dict,
     pfile: dict,
-) -> None:
-    """Send the selected nodes to Cytoscape.
+    previous: dict = None,
+    progress: ProgressReporter = None,
+) -> dict:
+    """Send the selected nodes to Cytoscape. Runs on a worker of the SendPool. If the network sent before to the same Cytoscape session still exists and the selection did not change too much, it is updated in place instead of creating a new network.
 
     Args:
-        message (dict): Message from the frontend.
         ip (str): Can be either the IP address of the client or the IP address of the server host.
-        user (str): Username of the client.
-        return_dict (dict): Dictionary to store the return value. Is a
-        multiprocessing dict to be able to return values from a subprocess.
+        pdata (dict): Current pdata of the VRNetzer, contains the selected nodes and layouts.
+        pfile (dict): pfile of the current project.
+        previous (dict, optional): state of the network sent before, see network_delta.network_state. Defaults to None.
+        progress (ProgressReporter, optional): reports the stages "extract", "network", "style" and "fit". The style is part of the bulk import and only reported as a stage of its own if the network is sent step by step. Defaults to None.
 
     Returns:
-        dict: Dictionary with the status of the process stored in the return_dict.
+        dict: Status of the process with the keys "message" and "status". On success, "network" holds the state of the sent network.
     """
-    return_dict["status"] = {
+    status = {
         "message": f"No node or link is selected.",
         "status": "error",
     }
@@ -53,10 +64,10 @@ def send_to_cytoscape(
     assert selected_nodes != None, "Selected Nodes is None"
     assert selected_links != None, "Selected Links is None"
     if len(selected_nodes) == 0 and len(selected_links) == 0:
-        st.log.debug(return_dict)
-        return
+        st.log.debug(status)
+        return status
 
-    port = 1234
+    port = st.CYREST_PORT
     layout_id, color_id = pdata.get("layoutsDD"), pdata.get("layoutsRGBDD")
     if layout_id is None:
         layout_id = 0
@@ -66,16 +77,18 @@ def send_to_cytoscape(
     color = pfile["layoutsRGB"][int(color_id)]
     title = f"{layout} & {color}"
     base_url = "http://" + str(ip) + f":{port}/v1"
+    client = get_client(base_url)
 
     try:
-        p4c.cytoscape_ping(base_url=base_url)
+        client.ping()
     except requests.exceptions.RequestException:
-        return_dict["status"] = {
+        status = {
             "message": f"Could not connect to Cytoscape at {base_url}. Please check if Cytoscape is running and if the url is correct. Is cyREST installed?",
             "status": "error",
         }
-        st.log.debug(return_dict)
-        return
+        st.log.debug(status)
+        return status
+    stage(progress, "extract")
     if len(selected_nodes) == 0:
         st.log.debug("No nodes selected.")
         links, selected_nodes = extract_link_data(
@@ -89,79 +102,153 @@ def send_to_cytoscape(
     st.log.debug("Extracted node and link data:")
     st.log.debug(nodes)
     st.log.debug(links)
-    # Create network
-    args = (nodes,)
-    if links.size > 0:
-        args += (links,)
     try:
-        suid = p4c.create_network_from_data_frames(
-            *args, base_url=base_url, collection=project, title=title
-        )
-        st.log.debug(f"Created network with SUID: {suid}")
-
-        # Create style
-        style = "VRNetzer_Style"
-        if style not in p4c.get_visual_style_names(
-            base_url=base_url,
-        ):
-            p4c.create_visual_style(style, base_url=base_url)
-            st.log.debug(f"Created style: {style}", flush=True)
-
-        # Set colors
-        p4c.set_node_color_mapping(
-            default_color="black",
-            table_column="color",
-            mapping_type="p",
-            style_name=style,
-            base_url=base_url,
-            network=suid,
-        )
-        st.log.debug(f"Set node color mapping", flush=True)
-
-        # Set layout
-        values = ["name", "size", "x", "y"]
-        properties = ["NODE_LABEL", "NODE_SIZE", "NODE_X_LOCATION", "NODE_Y_LOCATION"]
-        if "NODE_Z_LOCATION" in p4c.get_visual_property_names():
-            values.append("z")
-            properties.append("NODE_Z_LOCATION")
-
-        for property, column in zip(properties, values):
-            mapping = p4c.map_visual_property(
-                property,
-                table_column=column,
-                mapping_type="p",
-                base_url=base_url,
-                network=suid,
-            )
-            p4c.update_style_mapping(style, mapping, base_url=base_url)
-            st.log.debug(f"Set {property} mapping", flush=True)
-
-        # Set style
-        p4c.set_visual_style(style, base_url=base_url, network=suid)
-        st.log.debug(f"Set style: {style}", flush=True)
-
-        # Fit content
-        p4c.fit_content(base_url=base_url, network=suid)
-        st.log.debug(f"Fit content", flush=True)
-        st.log.debug(f"Created new network in Cytoscape at client {ip}:{port}")
-        return_dict["status"] = {
+        network = None
+        if can_update(client, previous, nodes):
+            try:
+                network = update_network(
+                    client, previous, nodes, links, title, progress
+                )
+                st.log.debug(f"Updated network in Cytoscape at client {ip}:{port}")
+            except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+                st.log.warning(f"Could not update network, creating a new one. {e}")
+        if network is None:
+            try:
+                # Import nodes, links, positions and style with a single request.
+                stage(progress, "network")
+                document = build_cx2(nodes, links, title)
+                suid = push_cx2(
+                    base_url,
+                    document,
+                    pfile["name"],
+                    session=client.session,
+                    progress=progress,
+                )
+            except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+                st.log.warning(
+                    f"Bulk import failed, sending the network step by step. {e}"
+                )
+                suid = send_with_p4c(nodes, links, client, project, title, progress)
+            network = network_state(suid, nodes, links)
+            st.log.debug(f"Created new network in Cytoscape at client {ip}:{port}")
+        status = {
             "message": f"Project {project} successfully send to Cytoscape.",
             "status": "success",
+            "network": network,
         }
 
+    except SendCancelled:
+        client.invalidate()
+        raise
     except Exception as e:
-        if isinstance(e, p4c.exceptions.CyError):
+        # The host might have been restarted or changed, do not trust its cached capabilities.
+        client.invalidate()
+        if _is_cy_error(e):
             st.log.debug(f"Could not send project to Cytoscape. {e}", flush=True)
-            return_dict["status"] = {
+            status = {
                 "message": f"Could not send project to Cytoscape. {e}. Network has been removed from Cytoscape!",
                 "status": "error",
             }
         elif isinstance(e, requests.exceptions.RequestException):
             st.log.debug(f"Could not send project to Cytoscape. {e}", flush=True)
-            return_dict["status"] = {
+            status = {
                 "message": f"Could not connect to Cytoscape at {base_url}. Please check if Cytoscape is running and if the url is correct. Is cyREST installed?",
                 "status": "error",
             }
+        else:
+            st.log.error(f"Could not send project to Cytoscape. {e}")
+            status = {
+                "message": f"Could not send project to Cytoscape. {e}",
+                "status": "error",
+            }
+    return status
+
+
+def _is_cy_error(e: Exception) -> bool:
+    # py4cytoscape is only imported by the step by step send.
+    p4c = sys.modules.get("py4cytoscape")
+    return p4c is not None and isinstance(e, p4c.exceptions.CyError)
+
+
+def send_with_p4c(
+    nodes: pd.DataFrame,
+    links: pd.DataFrame,
+    client: CyRESTClient,
+    project: Project,
+    title: str,
+    progress: ProgressReporter = None,
+) -> int:
+    """Creates the network and the VRNetzer style in Cytoscape with one cyREST request per step. Is used if Cytoscape does not accept CX2 documents.
+
+    Args:
+        nodes (pd.DataFrame): Extracted node data.
+        links (pd.DataFrame): Extracted link data.
+        client (CyRESTClient): Client of the Cytoscape host.
+        project (Project): Project the nodes belong to.
+        title (str): Name of the network.
+        progress (ProgressReporter, optional): reports the stages "style" and "fit". Defaults to None.
+
+    Returns:
+        int: SUID of the created network.
+    """
+    import py4cytoscape as p4c
+
+    base_url = client.base_url
+    # Create network
+    args = (nodes,)
+    if links.size > 0:
+        args += (links,)
+    suid = p4c.create_network_from_data_frames(
+        *args, base_url=base_url, collection=project, title=title
+    )
+    st.log.debug(f"Created network with SUID: {suid}")
+
+    # Create style
+    stage(progress, "style")
+    style = STYLE
+    if style not in client.style_names():
+        p4c.create_visual_style(style, base_url=base_url)
+        client.add_style(style)
+        st.log.debug(f"Created style: {style}", flush=True)
+
+    # Set colors
+    p4c.set_node_color_mapping(
+        default_color="black",
+        table_column="color",
+        mapping_type="p",
+        style_name=style,
+        base_url=base_url,
+        network=suid,
+    )
+    st.log.debug(f"Set node color mapping", flush=True)
+
+    # Set layout
+    values = ["name", "size", "x", "y"]
+    properties = ["NODE_LABEL", "NODE_SIZE", "NODE_X_LOCATION", "NODE_Y_LOCATION"]
+    if "NODE_Z_LOCATION" in client.visual_property_names():
+        values.append("z")
+        properties.append("NODE_Z_LOCATION")
+
+    for property, column in zip(properties, values):
+        mapping = p4c.map_visual_property(
+            property,
+            table_column=column,
+            mapping_type="p",
+            base_url=base_url,
+            network=suid,
+        )
+        p4c.update_style_mapping(style, mapping, base_url=base_url)
+        st.log.debug(f"Set {property} mapping", flush=True)
+
+    # Set style
+    p4c.set_visual_style(style, base_url=base_url, network=suid)
+    st.log.debug(f"Set style: {style}", flush=True)
+
+    # Fit content
+    stage(progress, "fit")
+    p4c.fit_content(base_url=base_url, network=suid)
+    st.log.debug(f"Fit content", flush=True)
+    return suid
 
 
 def extract_node_data(
@@ -178,10 +265,7 @@ def extract_node_data(
     Returns:
         tuple(pd.DataFrame,list[int]): Nodes data and selected nodes as nodes list gets reduced to a total of maximal 2000 nodes.
     """
-    project.read_nodes()
-    project.read_names()
-    nodes_data = pd.DataFrame(project.nodes["nodes"])
-    nodes_data = nodes_data[nodes_data.index.isin(selected_nodes)].copy()
+    nodes_data = read_nodes(project, selected_nodes)
     st.log.debug(nodes_data)
 
     if "layouts" in nodes_data.columns:
@@ -210,55 +294,26 @@ def extract_node_data(
     if color not in project.pfile["layoutsRGB"]:
         color = project.pfile["layoutsRGB"][0]
 
-    node_pos_l = list(
-        Image.open(os.path.join(project.location, "layouts", layout + ".bmp")).getdata()
+    # Positions are read by offset from the BMPs, decoded colors are cached.
+    index = nodes_data.index.to_numpy(np.int64)
+    node_pos_h = load_pixels(
+        os.path.join(project.location, "layouts", layout + ".bmp"), index
     )
-
-    node_pos_h = list(
-        Image.open(
-            os.path.join(project.location, "layoutsl", layout + "l.bmp")
-        ).getdata()
+    node_pos_l = load_pixels(
+        os.path.join(project.location, "layoutsl", layout + "l.bmp"), index
     )
-
-    node_colors = list(
-        Image.open(
-            os.path.join(project.location, "layoutsRGB", color + ".png")
-        ).getdata()
+    node_colors = load_pixels(
+        os.path.join(project.location, "layoutsRGB", color + ".png"), index
     )
 
-    node_colors = [node_colors[c] for c in nodes_data.index]
-    node_pos_l = [node_pos_l[c] for c in nodes_data.index]
-    node_pos_h = [node_pos_h[c] for c in nodes_data.index]
-
-    def rgb_to_hex(r, g, b):
-        return "#{:02x}{:02x}{:02x}".format(r, g, b)
-
     st.log.debug(f"{len(nodes_data)}, {len(node_colors)}")
-    nodes_data["color"] = node_colors
-    nodes_data["size"] = (
-        nodes_data["color"].swifter.progress_bar(False).apply(lambda x: x[-1])
-    )
-    nodes_data["size"].astype("int64")
-    nodes_data["color"] = (
-        nodes_data["color"]
-        .swifter.progress_bar(False)
-        .apply(lambda x: rgb_to_hex(*x[:3]))
-    )
+    nodes_data["size"] = node_colors[:, -1].astype(np.int64)
+    nodes_data["color"] = rgb_to_hex(node_colors[:, :3])
 
-    node_pos_h = [map(lambda x: x * 255, pixel) for pixel in node_pos_h]
-    pos = [[], [], []]
-    for pixel in zip(node_pos_h, node_pos_l):
-        high = tuple(pixel[0])
-        low = tuple(pixel[1])
-        for dim in range(3):
-            cord = (high[dim] + low[dim]) / 65280
-            pos[dim].append(cord)
-        # print(tuple(map(lambda x: sum(x), pixel)))
-    for col, dim in zip(["x", "y", "z"], pos):
-        nodes_data[col] = dim
-        nodes_data[col] = (
-            nodes_data[col].swifter.progress_bar(False).apply(lambda x: int(x * 1000))
-        )
+    # layouts/ holds the high and layoutsl/ the low byte of each coordinate.
+    pos = decode_positions(node_pos_h[:, :3], node_pos_l[:, :3])
+    for dim, col in enumerate(["x", "y", "z"]):
+        nodes_data[col] = (pos[:, dim] * 1000).astype(np.int64)
     if "n" in nodes_data.columns:
         nodes_data = nodes_data.drop(columns=["n"])
     nodes_data["shared name"] = nodes_data["name"].copy()
@@ -278,6 +333,9 @@ def extract_link_data(
     Returns:
         pd.DataFrame: Extracted link data.
     """
+    if sidecar.has_index(project.location, "links", sidecar.LINK_COLUMNS):
+        return read_links(project, nodes, selected_links)
+
     with open(os.path.join(project.location, "links.json"), "r") as f:
         links_data = json.load(f)["links"]
 
@@ -293,9 +351,81 @@ def extract_link_data(
             | links_data["s"].isin(str_nodes) & links_data["e"].isin(str_nodes)
         ]
     else:
-        all_links = pd.concat(links_data["s"], links_data["e"])
+        all_links = pd.concat([links_data["s"], links_data["e"]])
         nodes = all_links.unique()
     links_data = links_data.rename(columns={"s": "source", "e": "target"})
     links_data["interaction"] = ["interacts" for _ in range(len(links_data))]
     links_data = links_data.astype({"source": str, "target": str})
     return links_data, nodes
+
+
+def read_nodes(project: Project, selected_nodes: list[int]) -> pd.DataFrame:
+    """Reads the selected nodes of a project. Uses the sidecar index if it is up to date, so that only the selected records are parsed.
+
+    Args:
+        selected_nodes (list[int]): Selected nodes.
+        project (Project): Project to read from.
+
+    Returns:
+        pd.DataFrame: Selected nodes indexed by their position in nodes.json.
+    """
+    if not sidecar.has_index(project.location, "nodes"):
+        project.read_nodes()
+        nodes_data = pd.DataFrame(project.nodes["nodes"])
+        return nodes_data[nodes_data.index.isin(selected_nodes)].copy()
+
+    count = sidecar.read_meta(project.location, "nodes")["count"]
+    ids = np.unique(np.asarray(selected_nodes, dtype=np.int64))
+    ids = ids[(ids >= 0) & (ids < count)]
+    records = sidecar.read_records(project.location, "nodes", ids)
+    return pd.DataFrame(records, index=pd.Index(ids))
+
+
+def read_links(
+    project: Project, nodes: list[int], selected_links: list[int]
+) -> tuple[pd.DataFrame, list[int]]:
+    """Reads the links between the selected nodes from the sidecar index. The links are found through the adjacency lists of the selected nodes, so that only the matching records of links.json are parsed.
+
+    Args:
+        project (Project): Project to read from.
+        nodes (list[int]): IDs of selected nodes.
+        selected_links (list[int]): IDs of selected links.
+
+    Returns:
+        tuple[pd.DataFrame, list[int]]: Extracted link data and the nodes of the links.
+    """
+    starts = sidecar.load_column(project.location, "links.s")
+    ends = sidecar.load_column(project.location, "links.e")
+    if nodes:
+        ids = sidecar.induced_links(project.location, nodes)
+    else:
+        ids = np.arange(len(starts))
+    if selected_links:
+        selected = np.asarray(selected_links, dtype=np.int64)
+        ids = np.intersect1d(ids, selected[(selected >= 0) & (selected < len(starts))])
+    if not nodes:
+        nodes = np.unique(np.concatenate([starts[ids], ends[ids]]))
+    links_data = pd.DataFrame(
+        sidecar.read_records(project.location, "links", ids), index=pd.Index(ids)
+    )
+    if links_data.empty:
+        links_data = pd.DataFrame(columns=["s", "e"])
+    links_data = links_data.rename(columns={"s": "source", "e": "target"})
+    links_data["interaction"] = ["interacts" for _ in range(len(links_data))]
+    links_data = links_data.astype({"source": str, "target": str})
+    return links_data, nodes
+
+
+def rgb_to_hex(colors: np.ndarray) -> np.ndarray:
+    """Converts colors to hex strings.
+
+    Args:
+        colors (np.ndarray): colors with shape (N,3).
+
+    Returns:
+        np.ndarray: colors as hex strings, e.g. "#ff0000".
+    """
+    channels = _HEX[np.asarray(colors, dtype=np.uint8)]
+    return np.char.add(
+        np.char.add(np.char.add("#", channels[:, 0]), channels[:, 1]), channels[:, 2]
+    )
@@ -0,0 +1,108 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from . import settings as st
+from .manifest import atomic_write
+from .writer import to_builtin
+
+_ENCODE = json.JSONEncoder(default=to_builtin).encode
+
+
+def _float(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "Infinity" if value > 0 else "-Infinity"
+    return float.__repr__(value)
+
+
+def encode_column(column: pd.Series) -> list[str or None]:
+    """Encodes every value of a column as JSON. Null values (None, NaN, NA) are returned as None, so that they can be left out of the record.
+
+    Args:
+        column (pd.Series): column to encode.
+
+    Returns:
+        list[str or None]: JSON encoded values.
+    """
+    key = _ENCODE(str(column.name)) + ": "
+    mask = column.isna().to_numpy()
+    values = column.tolist()
+    dtype = column.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        encode = lambda v: "true" if v else "false"
+    elif pd.api.types.is_integer_dtype(dtype):
+        encode = str
+    elif pd.api.types.is_float_dtype(dtype):
+        encode = _float
+    else:
+        encode = _ENCODE
+    return [
+        None if null else key + encode(value) for value, null in zip(values, mask)
+    ]
+
+
+def _upcast(df: pd.DataFrame) -> pd.DataFrame:
+    # A row of a frame with only integer and float columns is a float Series, so its integers were written as floats.
+    dtypes = list(df.dtypes)
+    if not dtypes or not all(
+        isinstance(d, np.dtype) and d.kind in "iuf" for d in dtypes
+    ):
+        return df
+    common = np.result_type(*dtypes)
+    if common.kind != "f":
+        return df
+    return df.astype(common)
+
+
+def iter_records(df: pd.DataFrame, chunk_size: int = None):
+    """Encodes the rows of a data frame as JSON objects without null values. Equivalent to json.dumps(row.dropna().to_dict()) for each row of df.iterrows(), including the upcast of integers in frames with only numeric columns, but walks each column once per chunk instead of constructing a Series per row.
+
+    Args:
+        df (pd.DataFrame): data frame to encode.
+        chunk_size (int, optional): number of rows encoded at once. Bounds the memory used. Defaults to settings.JSON_CHUNK_SIZE.
+
+    Yields:
+        str: JSON object of a row.
+    """
+    if chunk_size is None:
+        chunk_size = st.JSON_CHUNK_SIZE
+    for start in range(0, len(df), chunk_size):
+        chunk = _upcast(df.iloc[start : start + chunk_size])
+        columns = [encode_column(chunk[c]) for c in chunk.columns]
+        for row in zip(*columns) if columns else ([] for _ in range(len(chunk))):
+            yield "{" + ", ".join(v for v in row if v is not None) + "}"
+
+
+def write_records(
+    df: pd.DataFrame, file: str, key: str, chunk_size: int = None
+) -> np.ndarray:
+    """Streams a data frame to a JSON file of the form {key: [record, ...]}, as read by the VRNetzer for nodes.json and links.json. The file is written atomically.
+
+    Args:
+        df (pd.DataFrame): nodes or links to write.
+        file (str): path of the JSON file.
+        key (str): key of the record list, e.g. "nodes".
+        chunk_size (int, optional): number of rows encoded at once. Defaults to settings.JSON_CHUNK_SIZE.
+
+    Returns:
+        np.ndarray: byte offsets of the records with shape (N+1,). Record i spans offsets[i] to offsets[i+1], including a trailing separator.
+    """
+    offsets = np.empty(len(df) + 1, dtype=np.int64)
+
+    def write(tmp):
+        # Records are ASCII only (ensure_ascii), so characters equal bytes.
+        with open(tmp, "w", encoding="ascii", buffering=1 << 20) as f:
+            position = f.write("{" + _ENCODE(key) + ": [")
+            for idx, record in enumerate(iter_records(df, chunk_size)):
+                if idx:
+                    position += f.write(", ")
+                offsets[idx] = position
+                position += f.write(record)
+            offsets[len(df)] = position
+            f.write("]}")
+
+    atomic_write(file, write)
+    return offsets
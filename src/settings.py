@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 from logging import DEBUG, INFO
 
@@ -34,8 +35,41 @@ os.makedirs(_NETWORKS_PATH, exist_ok=os.X_OK)
 # os.makedirs(_STYLES_PATH, exist_ok=os.X_OK)
 
 UNIPROT_MAP = os.path.join(_STATIC_PATH, "uniprot_mapping.csv")
+LAYOUT_ENGINE_GROUP = "cyex.layout_engines"  # Entry point group through which packages register layout engines
 _MAPPING_ARBITARY_COLOR = [255, 255, 255]
-MAX_NUM_LINKS = 262144
+UNMAPPED_LAYOUT_ALPHA = 10  # Alpha of not mapped nodes in the masked color layouts
+UNMAPPED_ALPHA = 50  # Alpha of not mapped nodes in the "Mapped" color layout
+LINK_TILE_KEY = "linkTiles"  # pfile key which lists the tiles of each link texture, "links" and "linksRGB" only list the first tile
+WRITER_THREADS = min(8, os.cpu_count() or 1)  # Threads writing textures and JSONs
+WRITER_MAX_PENDING = 32  # Maximal number of artifacts queued for writing
+PNG_COMPRESS_LEVEL = 6  # zlib compression level (0-9) of PNG textures
+WORKER_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"  # Start method of worker processes. The server runs threads, forking it could copy locks held by other threads
+TEXTURE_PROCESSES = os.cpu_count() or 1  # Worker processes encoding textures
+TEXTURE_CHUNK_SIZE = 65536  # Nodes or links encoded per texture worker task
+JSON_CHUNK_SIZE = 10000  # Records encoded at once when writing nodes.json and links.json
+JOB_STORE_PATH = os.path.join(_STATIC_PATH, "cyex_jobs")  # Networks submitted from Cytoscape, kept with the data of the VRNetzer
+JOB_TTL = 24 * 60 * 60  # Seconds until a submitted network is evicted
+JOB_STORE_MAX_BYTES = 512 * 1024**2  # Maximal compressed size of all submitted networks
+UPLOAD_WORKERS = 2  # Uploads processed at the same time
+UPLOAD_CPU_BUDGET = os.cpu_count() or 1  # Worker processes shared by all running uploads
+UPLOAD_MEMORY_BUDGET = None  # Bytes shared by all running uploads, None for half of the physical memory
+UPLOAD_MAX_QUEUED = 16  # Uploads waiting for resources before new ones are rejected
+UPLOAD_BASE_BYTES = 256 * 1024**2  # Estimated memory of an upload without nodes and links
+UPLOAD_BYTES_PER_NODE = 2048  # Estimated memory per node and layout
+UPLOAD_BYTES_PER_LINK = 512  # Estimated memory per link
+SEND_WORKERS = 2  # Worker processes sending networks to Cytoscape
+SEND_TIMEOUT = 300  # Seconds until a send to Cytoscape is aborted
+SEND_MAX_PENDING = 16  # Sends which can be queued or running at the same time
+SEND_DELTA_MAX_CHANGE = 0.5  # Largest share of added and removed nodes for which a sent network is updated instead of re-created
+SENT_NETWORKS_MAX = 64  # Networks in Cytoscape remembered to update them on the next send
+CYREST_PORT = 1234  # Port of cyREST on the Cytoscape hosts
+CYREST_CACHE_TTL = 60  # Seconds the ping, visual properties and styles of a Cytoscape host are cached
+CYREST_POOL_SIZE = 4  # Kept alive connections per Cytoscape host
+TEXTURE_CACHE_BYTES = 256 * 1024**2  # Decoded textures kept in memory per process for sends
+UPLOAD_JOB_TTL = 60 * 60  # Seconds the result of a finished upload is kept
+PROJECT_SYNC_THREADS = min(8, os.cpu_count() or 1)  # Threads hashing and copying bundled projects on boot
+PROJECT_SYNC_HARDLINK = False  # Hard link bundled project files which can not be reflinked instead of copying them. Only safe if projects are never modified in place
+IMPORT_TIME_BUDGET = 0.5  # Seconds the backend may spend importing the extension, checked by the startup benchmark
 log = logger.get_logger(
     level=_LOG_LEVEL,
     f_level=F_LOG_LEVEL,
@@ -0,0 +1,231 @@
+import json
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+
+from .classes import LinkTags as LiT
+from .manifest import atomic_write
+from .serializer import write_records
+from .settings import log
+
+SIDECAR_DIR = "cyex_index"  # Binary index of nodes.json and links.json
+META_FILE = "meta.json"  # Record count, size and modification time of the indexed JSON file
+
+# Columns of the links index: start and end node and the adjacency of the nodes in CSR format.
+LINK_COLUMNS = ("s", "e", "adj_offsets", "adj_neighbors", "adj_links")
+
+_DECODER = json.JSONDecoder()
+
+
+def _path(location: str, *names: str) -> str:
+    return os.path.join(location, SIDECAR_DIR, *names)
+
+
+def _save_array(location: str, name: str, array: np.ndarray) -> None:
+    atomic_write(
+        _path(location, f"{name}.npy"), lambda tmp: np.save(tmp, array), suffix=".npy"
+    )
+
+
+def node_ids(values: pd.Series) -> np.ndarray:
+    """Normalizes node ids which might be stored as int, float or str to int64. Missing or invalid ids become -1.
+
+    Args:
+        values (pd.Series): node ids.
+
+    Returns:
+        np.ndarray: node ids with dtype int64.
+    """
+    ids = pd.to_numeric(values, errors="coerce").to_numpy(np.float64)
+    return np.where(np.isnan(ids), -1, ids).astype(np.int64)
+
+
+def write_index(
+    location: str,
+    kind: str,
+    offsets: np.ndarray,
+    json_file: str,
+    columns: dict[str, np.ndarray] = None,
+) -> None:
+    """Writes the record offsets and columns of nodes.json or links.json. The meta file is written last, so that an interrupted write leaves no valid index behind.
+
+    Args:
+        location (str): path to the project folder.
+        kind (str): "nodes" or "links".
+        offsets (np.ndarray): byte offsets of the records, as returned by serializer.write_records.
+        json_file (str): path of the indexed JSON file.
+        columns (dict[str, np.ndarray], optional): memory mappable columns of the records, e.g. {"s": ..., "e": ...}. Defaults to None.
+    """
+    os.makedirs(_path(location), exist_ok=True)
+    meta_file = _path(location, f"{kind}.{META_FILE}")
+    if os.path.isfile(meta_file):
+        os.remove(meta_file)
+    _save_array(location, f"{kind}.offsets", offsets)
+    for name, column in (columns or {}).items():
+        _save_array(location, f"{kind}.{name}", column)
+    stat = os.stat(json_file)
+    meta = {
+        "count": len(offsets) - 1,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "columns": sorted(columns or {}),
+    }
+
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+
+    atomic_write(meta_file, write)
+
+
+def write_indexed(
+    location: str, kind: str, df: pd.DataFrame, columns: dict[str, np.ndarray] = None
+) -> None:
+    """Streams nodes.json or links.json and writes its index.
+
+    Args:
+        location (str): path to the project folder.
+        kind (str): "nodes" or "links".
+        df (pd.DataFrame): records to write.
+        columns (dict[str, np.ndarray], optional): memory mappable columns of the records. Defaults to None.
+    """
+    json_file = os.path.join(location, f"{kind}.json")
+    offsets = write_records(df, json_file, kind)
+    write_index(location, kind, offsets, json_file, columns)
+
+
+def link_columns(links: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Start and end node of every link, normalized to integer ids, together with the adjacency of the nodes.
+
+    Args:
+        links (pd.DataFrame): links of the project.
+
+    Returns:
+        dict[str, np.ndarray]: columns "s" and "e" as well as the adjacency columns, see adjacency.
+    """
+    starts, ends = node_ids(links[LiT.start]), node_ids(links[LiT.end])
+    return {"s": starts, "e": ends, **adjacency(starts, ends)}
+
+
+def adjacency(starts: np.ndarray, ends: np.ndarray) -> dict[str, np.ndarray]:
+    """Builds the adjacency of an undirected graph in compressed sparse row format. The neighbors of node i are adj_neighbors[adj_offsets[i]:adj_offsets[i+1]] and adj_links holds the id of the link to each of them. Links with a missing node are left out.
+
+    Args:
+        starts (np.ndarray): start node of every link, -1 if missing.
+        ends (np.ndarray): end node of every link, -1 if missing.
+
+    Returns:
+        dict[str, np.ndarray]: columns "adj_offsets", "adj_neighbors" and "adj_links".
+    """
+    links = np.flatnonzero((starts >= 0) & (ends >= 0))
+    sources = np.concatenate([starts[links], ends[links]])
+    targets = np.concatenate([ends[links], starts[links]])
+    link_ids = np.concatenate([links, links])
+    order = np.argsort(sources, kind="stable")
+    n_nodes = int(sources.max()) + 1 if len(sources) else 0
+    offsets = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=n_nodes), out=offsets[1:])
+    return {
+        "adj_offsets": offsets,
+        "adj_neighbors": targets[order],
+        "adj_links": link_ids[order],
+    }
+
+
+def induced_links(location: str, nodes) -> np.ndarray:
+    """Ids of the links between the given nodes. Only the adjacency lists of the given nodes are read.
+
+    Args:
+        location (str): path to the project folder.
+        nodes (Iterable[int]): node ids.
+
+    Returns:
+        np.ndarray: sorted link ids.
+    """
+    offsets = load_column(location, "links.adj_offsets")
+    nodes = np.unique(np.asarray(nodes, dtype=np.int64))
+    nodes = nodes[(nodes >= 0) & (nodes < len(offsets) - 1)]
+    starts, stops = offsets[nodes], offsets[nodes + 1]
+    lengths = stops - starts
+    if not lengths.sum():
+        return np.empty(0, dtype=np.int64)
+    # Positions of all entries of the selected lists, without a Python loop over the nodes.
+    positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(
+        lengths.sum()
+    )
+    neighbors = load_column(location, "links.adj_neighbors")[positions]
+    links = load_column(location, "links.adj_links")[positions]
+    return np.unique(links[np.isin(neighbors, nodes)])
+
+
+def read_meta(location: str, kind: str) -> dict or None:
+    try:
+        with open(_path(location, f"{kind}.{META_FILE}"), "r") as f:
+            return json.load(f)
+    except (OSError, json.decoder.JSONDecodeError):
+        return None
+
+
+def has_index(location: str, kind: str, columns: tuple[str] = ()) -> bool:
+    """Checks whether the index of nodes.json or links.json exists and matches the JSON file.
+
+    Args:
+        location (str): path to the project folder.
+        kind (str): "nodes" or "links".
+        columns (tuple[str], optional): columns the index has to provide. Defaults to ().
+
+    Returns:
+        bool: True if the index can be used.
+    """
+    meta = read_meta(location, kind)
+    json_file = os.path.join(location, f"{kind}.json")
+    if meta is None or not os.path.isfile(json_file):
+        return False
+    stat = os.stat(json_file)
+    # A file rewritten with the same size, e.g. with edited values, has a new modification time.
+    if stat.st_size != meta.get("size") or stat.st_mtime_ns != meta.get("mtime"):
+        log.debug(f"Index of {json_file} is outdated.")
+        return False
+    if not set(columns).issubset(meta.get("columns", [])):
+        return False
+    return os.path.isfile(_path(location, f"{kind}.offsets.npy"))
+
+
+def load_column(location: str, name: str) -> np.ndarray:
+    """Memory maps a column of the index.
+
+    Args:
+        location (str): path to the project folder.
+        name (str): name of the column, e.g. "links.s" or "nodes.offsets".
+
+    Returns:
+        np.ndarray: read only, memory mapped column.
+    """
+    return np.load(_path(location, f"{name}.npy"), mmap_mode="r")
+
+
+def read_records(location: str, kind: str, ids) -> list[dict]:
+    """Reads single records of nodes.json or links.json without parsing the whole file.
+
+    Args:
+        location (str): path to the project folder.
+        kind (str): "nodes" or "links".
+        ids (Iterable[int]): positions of the records to read.
+
+    Returns:
+        list[dict]: the records in the order of ids.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    if len(ids) == 0:
+        return []
+    offsets = load_column(location, f"{kind}.offsets")
+    starts, ends = offsets[ids], offsets[ids + 1]
+    records = []
+    with open(os.path.join(location, f"{kind}.json"), "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                record, _ = _DECODER.raw_decode(data[start:end].decode("ascii"))
+                records.append(record)
+    return records
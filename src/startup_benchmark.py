@@ -0,0 +1,183 @@
+import argparse
+import multiprocessing as mp
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import settings as st
+from .send_pool import _ready, _warm_up
+from .settings import log
+
+SERVER_MODULE = f"{__package__}.app"  # Module the backend imports to load the extension
+HEAVY_MODULES = [
+    "open3d",
+    "matplotlib",
+    "swifter",
+    "py4cytoscape",
+    "pandas",
+    "networkx",
+    "PIL",
+    "requests",
+]  # Libraries which should only be loaded by the feature which needs them
+
+# Exits right after the import. The send workers started by the import would keep the interpreter and its output pipes alive.
+_EXIT = """
+for child in multiprocessing.active_children():
+    child.terminate()
+os._exit(0)
+"""
+# Imports a module with the output of forked children, e.g. the send workers, silenced. Their import times would interleave with the profile of the server process.
+_PROFILE = (
+    """
+import multiprocessing, os, sys
+import multiprocessing.util
+
+
+def _quiet(_):
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+
+
+multiprocessing.util.register_after_fork(_quiet, _quiet)
+# importlib.import_module would bypass -X importtime for the module itself.
+__import__(sys.argv[1])
+print(" ".join(m for m in sys.argv[2:] if m in sys.modules), flush=True)
+"""
+    + _EXIT
+)
+
+
+def import_profile(module: str = SERVER_MODULE) -> tuple[list[tuple], list[str]]:
+    """Imports a module in a fresh interpreter with -X importtime. Run from the backend directory, so that the host modules can be imported.
+
+    Args:
+        module (str, optional): module to import. Defaults to SERVER_MODULE.
+
+    Raises:
+        RuntimeError: if the module could not be imported.
+
+    Returns:
+        tuple[list[tuple], list[str]]: name, self and cumulative seconds of every imported module sorted by the cumulative seconds and the HEAVY_MODULES which were loaded.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROFILE, module, *HEAVY_MODULES],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Could not import {module}:\n{result.stderr}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(own) / 1e6, int(cumulative) / 1e6))
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows, result.stdout.split()
+
+
+def boot_time(module: str = SERVER_MODULE, repeat: int = 5) -> tuple[float, float]:
+    """Measures how long a fresh interpreter takes to import a module.
+
+    Args:
+        module (str, optional): module to import. Defaults to SERVER_MODULE.
+        repeat (int, optional): number of measured interpreters. Defaults to 5.
+
+    Returns:
+        tuple[float, float]: median seconds of an empty interpreter and of one importing the module.
+    """
+
+    def median(code: str) -> float:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check=True)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times)
+
+    return median("pass"), median(f"import multiprocessing, os, {module}\n{_EXIT}")
+
+
+def spawn_time(method: str, workers: int = 1) -> float:
+    """Measures how long it takes until newly started send workers are ready, including the import of the send pipeline.
+
+    Args:
+        method (str): start method of the worker processes, see multiprocessing.get_all_start_methods.
+        workers (int, optional): number of started workers. Defaults to 1.
+
+    Returns:
+        float: seconds until all workers answered.
+    """
+    context = mp.get_context(method)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+        workers,
+        mp_context=context,
+        initializer=_warm_up,
+        initargs=(context.Queue(), context.Array("b", 1)),
+    ) as pool:
+        for future in [pool.submit(_ready) for _ in range(workers)]:
+            future.result()
+        return time.perf_counter() - start
+
+
+def run(
+    module: str = SERVER_MODULE, repeat: int = 5, workers: int = None, top: int = 20
+) -> bool:
+    """Prints the import profile of the extension, the boot time of the backend process and the spawn time of the send workers.
+
+    Args:
+        module (str, optional): module the backend imports. Defaults to SERVER_MODULE.
+        repeat (int, optional): number of measured interpreters. Defaults to 5.
+        workers (int, optional): number of started send workers. Defaults to settings.SEND_WORKERS.
+        top (int, optional): number of listed modules. Defaults to 20.
+
+    Returns:
+        bool: whether the import stayed within settings.IMPORT_TIME_BUDGET.
+    """
+    if workers is None:
+        workers = st.SEND_WORKERS
+    rows, heavy = import_profile(module)
+    imported = next((row[2] for row in rows if row[0] == module), float("inf"))
+    print(f"Slowest imports of {module} (seconds):")
+    print(f"{'cumulative':>10} {'self':>8}  module")
+    for name, own, cumulative in rows[:top]:
+        print(f"{cumulative:>10.4f} {own:>8.4f}  {name}")
+    print(f"Heavy libraries loaded by the import: {', '.join(heavy) or 'none'}")
+
+    interpreter, booted = boot_time(module, repeat)
+    print(
+        f"Boot: {booted:.3f}s ({interpreter:.3f}s interpreter, {booted - interpreter:.3f}s extension)"
+    )
+    spawns = {method: spawn_time(method, workers) for method in mp.get_all_start_methods()}
+    for method, seconds in spawns.items():
+        print(f"Spawn of {workers} send workers ({method}): {seconds:.3f}s")
+    log.info(
+        f"Startup: import {imported:.3f}s, boot {booted:.3f}s, spawn {spawns}, heavy {heavy}",
+        runtime=True,
+    )
+
+    within = imported <= st.IMPORT_TIME_BUDGET
+    if not within:
+        print(f"Import of {module} exceeds the budget of {st.IMPORT_TIME_BUDGET}s!")
+    return within
+
+
+def main(argv: list[str] = None) -> None:
+    """Command line entry point. Run from the backend directory, e.g. python -m extensions.CyEx.src.startup_benchmark --repeat 10. Exits with 1 if the import exceeds settings.IMPORT_TIME_BUDGET."""
+    parser = argparse.ArgumentParser(
+        description="Profile the import of CyEx, the boot of the backend and the spawn of the send workers."
+    )
+    parser.add_argument("--module", default=SERVER_MODULE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+    sys.exit(0 if run(args.module, args.repeat, args.workers, args.top) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import settings as st
+from .settings import log
+
+
+class TextureCache:
+    """Process wide LRU cache of decoded textures. Textures are stored as read only NumPy arrays of their pixels and keyed by path, modification time and size, so that a texture rewritten by an upload is decoded again. The least recently used textures are evicted as soon as the cached pixels exceed max_bytes.
+
+    max_bytes (int, optional): maximal size of the cached pixels. Defaults to settings.TEXTURE_CACHE_BYTES.
+    """
+
+    def __init__(self, max_bytes: int = None) -> None:
+        if max_bytes is None:
+            max_bytes = st.TEXTURE_CACHE_BYTES
+        self.max_bytes: int = max_bytes
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._textures: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> np.ndarray:
+        """Returns the pixels of a texture, decodes it if it is not cached.
+
+        Args:
+            path (str): path of the texture.
+
+        Returns:
+            np.ndarray: read only pixels with shape (height*width, channels) in row major order starting at the top left.
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            pixels = self._textures.get(key)
+            if pixels is not None:
+                self._textures.move_to_end(key)
+                self.hits += 1
+                return pixels
+            self.misses += 1
+        pixels = decode(path)
+        with self._lock:
+            if key not in self._textures:
+                self._textures[key] = pixels
+                self.size += pixels.nbytes
+                self._evict()
+        return pixels
+
+    def clear(self) -> None:
+        with self._lock:
+            self._textures.clear()
+            self.size = 0
+
+    def _evict(self) -> None:
+        # The newest texture is kept even if it exceeds max_bytes alone.
+        while self.size > self.max_bytes and len(self._textures) > 1:
+            key, pixels = self._textures.popitem(last=False)
+            self.size -= pixels.nbytes
+            log.debug(f"Evicted texture {key[0]} from cache")
+
+
+def read_bmp_pixels(path: str, ids: np.ndarray) -> np.ndarray or None:
+    """Reads single pixels of an uncompressed BMP without decoding the whole image. The pixel array is memory mapped and only the bytes of the requested pixels are touched.
+
+    Args:
+        path (str): path of the BMP.
+        ids (np.ndarray): indices of the pixels in row major order starting at the top left, as written by the uploader.
+
+    Returns:
+        np.ndarray or None: RGB pixels with shape (N,3). None if the BMP is compressed or has no 24 or 32 bit pixels.
+    """
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    header = data[:34].tobytes()
+    if len(header) < 34 or header[:2] != b"BM":
+        return None
+    offset = int.from_bytes(header[10:14], "little")
+    width = int.from_bytes(header[18:22], "little", signed=True)
+    height = int.from_bytes(header[22:26], "little", signed=True)
+    bpp = int.from_bytes(header[28:30], "little")
+    compression = int.from_bytes(header[30:34], "little")
+    if compression != 0 or bpp not in (24, 32):
+        return None
+    # Rows are padded to 4 bytes and stored bottom up, unless the height is negative.
+    row_size = (bpp * width + 31) // 32 * 4
+    ids = np.asarray(ids, dtype=np.int64)
+    rows, cols = ids // width, ids % width
+    if height > 0:
+        rows = height - 1 - rows
+    starts = offset + rows * row_size + cols * (bpp // 8)
+    # Pixels are stored as BGR.
+    return np.asarray(data[starts[:, None] + np.array([2, 1, 0])])
+
+
+def load_pixels(path: str, ids: np.ndarray) -> np.ndarray:
+    """Returns the selected pixels of a texture. Uncompressed BMPs are read by offset, so that the cost only depends on the number of selected pixels, other textures are decoded through the cache.
+
+    Args:
+        path (str): path of the texture.
+        ids (np.ndarray): indices of the pixels.
+
+    Returns:
+        np.ndarray: pixels with shape (N,channels).
+    """
+    if path.endswith(".bmp"):
+        pixels = read_bmp_pixels(path, ids)
+        if pixels is not None:
+            return pixels
+    return load_texture(path)[ids]
+
+
+def decode(path: str) -> np.ndarray:
+    """Decodes a texture into a read only array of its pixels.
+
+    Args:
+        path (str): path of the texture.
+
+    Returns:
+        np.ndarray: pixels with shape (height*width, channels).
+    """
+    from PIL import Image
+
+    with Image.open(path) as image:
+        pixels = np.asarray(image)
+    pixels = pixels.reshape(pixels.shape[0] * pixels.shape[1], -1)
+    pixels.setflags(write=False)
+    return pixels
+
+
+_CACHE = TextureCache()
+
+
+def load_texture(path: str) -> np.ndarray:
+    """Returns the pixels of a texture from the cache of this process, see TextureCache.get."""
+    return _CACHE.get(path)
@@ -0,0 +1,192 @@
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from . import settings as st
+from . import textures as tex
+from .settings import log
+
+# Arrays attached by a worker process. Maps the name of an array to its shared memory block and its NumPy view.
+_ATTACHED: dict[str, tuple[SharedMemory, np.ndarray]] = {}
+_CONTEXT = mp.get_context(st.WORKER_START_METHOD)
+
+
+def _attach(specs: dict[str, tuple[str, tuple, str]]) -> None:
+    """Pool initializer. Attaches the shared memory blocks of the engine once per worker.
+
+    Args:
+        specs (dict[str, tuple[str, tuple, str]]): array names as keys and the name, shape and dtype of their shared memory block as values.
+    """
+    for key, (name, shape, dtype) in specs.items():
+        shm = SharedMemory(name=name)
+        _ATTACHED[key] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+
+
+def _call(func, task: tuple) -> None:
+    func({key: view for key, (_, view) in _ATTACHED.items()}, *task)
+
+
+def encode_position_range(
+    arrays: dict[str, np.ndarray], layout: int, start: int, stop: int
+) -> None:
+    """Encodes the coordinates of the nodes start to stop of a layout into the high and low textures.
+
+    Args:
+        arrays (dict[str, np.ndarray]): input and output arrays by their name.
+        layout (int): index of the layout.
+        start (int): first node of the range.
+        stop (int): end of the range (exclusive).
+    """
+    high, low = tex.encode_positions(arrays["positions"][layout, start:stop])
+    arrays["high"][layout, start:stop] = high
+    arrays["low"][layout, start:stop] = low
+
+
+def encode_link_range(arrays: dict[str, np.ndarray], start: int, stop: int) -> None:
+    """Encodes the start and end pixels of the links start to stop.
+
+    Args:
+        arrays (dict[str, np.ndarray]): input and output arrays by their name.
+        start (int): first link of the range.
+        stop (int): end of the range (exclusive).
+    """
+    arrays["xyz"][2 * start : 2 * stop] = tex.link_xyz_buffer(
+        arrays["starts"][start:stop], arrays["ends"][start:stop]
+    )
+
+
+class TextureEngine:
+    """Parallel texture encoder. Input and output arrays are placed in shared memory once and worker processes only receive the offsets of the pixel range they have to encode. Work is split by pixel ranges instead of whole layouts, so that a single large layout is spread over all workers as well.
+
+    processes (int, optional): Number of worker processes. If 1, everything is encoded in the calling process. Defaults to settings.TEXTURE_PROCESSES.
+    chunk_size (int, optional): Number of nodes or links encoded per task. Defaults to settings.TEXTURE_CHUNK_SIZE.
+    """
+
+    def __init__(self, processes: int = None, chunk_size: int = None) -> None:
+        if processes is None:
+            processes = st.TEXTURE_PROCESSES
+        if chunk_size is None:
+            chunk_size = st.TEXTURE_CHUNK_SIZE
+        self.processes: int = max(1, processes)
+        self.chunk_size: int = chunk_size
+
+    def encode_positions(
+        self, positions: np.ndarray, height: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Encodes the coordinates of all layouts into the high and low textures.
+
+        Args:
+            positions (np.ndarray): coordinates with shape (P,N,3) of P layouts.
+            height (int): height of the node textures.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: high and low textures, both with shape (P,height,128,3).
+        """
+        n_layouts, n_nodes = positions.shape[:2]
+        pixels = height * tex.NODE_TEX_WIDTH
+        outputs = {
+            "high": ((n_layouts, pixels, 3), np.uint8),
+            "low": ((n_layouts, pixels, 3), np.uint8),
+        }
+        tasks = [
+            (layout, start, min(start + self.chunk_size, n_nodes))
+            for layout in range(n_layouts)
+            for start in range(0, n_nodes, self.chunk_size)
+        ]
+        result = self._run(
+            encode_position_range, tasks, {"positions": positions}, outputs
+        )
+        shape = (n_layouts, height, tex.NODE_TEX_WIDTH, 3)
+        return result["high"].reshape(shape), result["low"].reshape(shape)
+
+    def encode_links(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """Encodes the start and end pixels of all links. The result is padded to a multiple of textures.LINKS_PER_TILE links, so that each tile is a view of it.
+
+        Args:
+            starts (np.ndarray): ids of the start nodes. NaN is addressed as node 0.
+            ends (np.ndarray): ids of the end nodes. NaN is addressed as node 0.
+
+        Returns:
+            np.ndarray: interleaved start and end pixels with shape (2*tiles*LINKS_PER_TILE,3).
+        """
+        n_links = len(starts)
+        pixels = 2 * tex.link_tile_count(n_links) * tex.LINKS_PER_TILE
+        tasks = [
+            (start, min(start + self.chunk_size, n_links))
+            for start in range(0, n_links, self.chunk_size)
+        ]
+        result = self._run(
+            encode_link_range,
+            tasks,
+            {
+                "starts": np.asarray(starts, dtype=np.float64),
+                "ends": np.asarray(ends, dtype=np.float64),
+            },
+            {"xyz": ((pixels, 3), np.uint8)},
+        )
+        return result["xyz"]
+
+    def _run(
+        self,
+        func,
+        tasks: list[tuple],
+        inputs: dict[str, np.ndarray],
+        outputs: dict[str, tuple[tuple, np.dtype]],
+    ) -> dict[str, np.ndarray]:
+        """Places inputs and zeroed outputs in shared memory, runs the tasks and copies the outputs back.
+
+        Args:
+            func (Callable): module level function which encodes one task. Is called with the input and output arrays and the offsets of the task.
+            tasks (list[tuple]): offsets passed to func.
+            inputs (dict[str, np.ndarray]): arrays read by the workers.
+            outputs (dict[str, tuple[tuple, np.dtype]]): shape and dtype of the arrays written by the workers.
+
+        Returns:
+            dict[str, np.ndarray]: the output arrays.
+        """
+        processes = min(self.processes, len(tasks))
+        if processes <= 1:
+            # Not worth spawning workers, encode in this process. The arrays are local to this call, so that concurrent uploads do not share them.
+            arrays = dict(inputs)
+            for key, (shape, dtype) in outputs.items():
+                arrays[key] = np.zeros(shape, dtype=dtype)
+            for task in tasks:
+                func(arrays, *task)
+            return {key: arrays[key] for key in outputs}
+
+        blocks, specs, views = [], {}, {}
+        view = None
+        try:
+            for key, array in inputs.items():
+                shm, view = self._create(array.shape, array.dtype)
+                view[:] = array
+                blocks.append(shm)
+                specs[key] = (shm.name, array.shape, array.dtype.str)
+            for key, (shape, dtype) in outputs.items():
+                shm, view = self._create(shape, np.dtype(dtype))
+                view.fill(0)
+                blocks.append(shm)
+                views[key] = view
+                specs[key] = (shm.name, shape, np.dtype(dtype).str)
+            log.debug(
+                f"Encoding {len(tasks)} texture chunks on {processes} processes."
+            )
+            with _CONTEXT.Pool(
+                processes, initializer=_attach, initargs=(specs,)
+            ) as pool:
+                pool.starmap(_call, [(func, task) for task in tasks])
+            return {key: view.copy() for key, view in views.items()}
+        finally:
+            # Views have to be released before their blocks can be closed.
+            views.clear()
+            view = None
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    @staticmethod
+    def _create(shape: tuple, dtype: np.dtype) -> tuple[SharedMemory, np.ndarray]:
+        size = max(1, int(np.prod(shape)) * dtype.itemsize)
+        shm = SharedMemory(create=True, size=size)
+        return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
@@ -0,0 +1,241 @@
+import numpy as np
+import pandas as pd
+
+NODE_TEX_WIDTH = 128  # Width of the node textures
+NODES_PER_PAGE = NODE_TEX_WIDTH * NODE_TEX_WIDTH  # Nodes addressed by two channels
+LINK_TEX_WIDTH = 1024  # Width of the link position texture (two pixels per link)
+LINK_TEX_HEIGHT = 512  # Height of the link textures
+LINK_RGB_WIDTH = 512  # Width of the link color texture (one pixel per link)
+LINKS_PER_TILE = LINK_RGB_WIDTH * LINK_TEX_HEIGHT  # Links stored in one texture tile
+MAX_NODES = 256 * NODES_PER_PAGE  # Nodes addressable with one byte per channel
+
+
+def pixel_address(ids: np.ndarray) -> np.ndarray:
+    """Translates node ids into the pixel address used by the link textures. The first channel holds the column, the second the row and the third the page of the node in the node textures.
+
+    Args:
+        ids (np.ndarray): node ids. Missing ids (NaN) are addressed as node 0.
+
+    Raises:
+        ValueError: if a node id is negative or not below MAX_NODES.
+
+    Returns:
+        np.ndarray: Array of shape (N,3) with the RGB encoded pixel address of each node.
+    """
+    ids = np.nan_to_num(np.asarray(ids, dtype=np.float64)).astype(np.int64)
+    if len(ids) and (ids.min() < 0 or ids.max() >= MAX_NODES):
+        raise ValueError(
+            f"Node ids must be between 0 and {MAX_NODES - 1} to be addressed by the link textures."
+        )
+    address = np.empty((len(ids), 3), dtype=np.uint8)
+    address[:, 0] = ids % NODE_TEX_WIDTH
+    address[:, 1] = ids // NODE_TEX_WIDTH % NODE_TEX_WIDTH
+    address[:, 2] = ids // NODES_PER_PAGE
+    return address
+
+
+def link_xyz_buffer(start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """Interleaves the pixel addresses of start and end nodes so that each link occupies two consecutive pixels.
+
+    Args:
+        start (np.ndarray): ids of the start nodes.
+        end (np.ndarray): ids of the end nodes.
+
+    Returns:
+        np.ndarray: Array of shape (2L,3) containing start0, end0, start1, end1, ...
+    """
+    buffer = np.empty((2 * len(start), 3), dtype=np.uint8)
+    buffer[0::2] = pixel_address(start)
+    buffer[1::2] = pixel_address(end)
+    return buffer
+
+
+def node_tex_height(n_nodes: int) -> int:
+    """Height of the node textures for a network with n_nodes nodes.
+
+    Args:
+        n_nodes (int): number of nodes.
+
+    Returns:
+        int: height of the node textures.
+    """
+    return NODE_TEX_WIDTH * (n_nodes // NODES_PER_PAGE + 1)
+
+
+def _entry_lengths(values: np.ndarray) -> np.ndarray:
+    return np.fromiter(
+        (len(v) if isinstance(v, (list, tuple, np.ndarray)) else 0 for v in values),
+        dtype=np.int64,
+        count=len(values),
+    )
+
+
+def position_array(positions: pd.Series) -> np.ndarray:
+    """Converts a column of node coordinates to a float array. Nodes without coordinates get NaN.
+
+    Args:
+        positions (pd.Series): Column containing lists of three coordinates.
+
+    Returns:
+        np.ndarray: Array of shape (N,3) with dtype float64.
+    """
+    values = positions.to_numpy(dtype=object)
+    result = np.full((len(values), 3), np.nan)
+    idx = np.flatnonzero(_entry_lengths(values) == 3)
+    if len(idx) > 0:
+        result[idx] = np.array(values[idx].tolist(), dtype=np.float64)
+    return result
+
+
+def encode_positions(positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Encodes normalized coordinates into the high and low byte textures of the VRNetzer. A coordinate c is stored as high*255 + low = int(c*65280).
+
+    Args:
+        positions (np.ndarray): coordinates in the range of 0 to 1 with shape (N,3). NaN is encoded as 0.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: high and low bytes, both with shape (N,3) and dtype uint8.
+    """
+    values = np.nan_to_num(positions * 65280).astype(np.int64)
+    values = np.clip(values, 0, 65280)
+    high = np.minimum(values // 255, 255)
+    low = values - high * 255
+    return high.astype(np.uint8), low.astype(np.uint8)
+
+
+def decode_positions(high: np.ndarray, low: np.ndarray) -> np.ndarray:
+    """Decodes coordinates of the high and low byte textures, the inverse of encode_positions up to 1/65280.
+
+    Args:
+        high (np.ndarray): pixels of layouts/ with shape (N,3).
+        low (np.ndarray): pixels of layoutsl/ with shape (N,3).
+
+    Returns:
+        np.ndarray: coordinates between 0 and 1 with shape (N,3).
+    """
+    return (high.astype(np.float64) * 255 + low) / 65280
+
+
+def color_array(colors: pd.Series, alpha: int = 255) -> np.ndarray:
+    """Converts a column of RGB(A) colors to an RGBA array. Entries which are no color (NaN, "<NA>", None, ...) become fully transparent black.
+
+    Args:
+        colors (pd.Series): Column containing lists or tuples of length 3 or 4.
+        alpha (int, optional): alpha channel given to RGB colors. Defaults to 255.
+
+    Returns:
+        np.ndarray: Array of shape (N,4) with dtype uint8.
+    """
+    values = colors.to_numpy(dtype=object)
+    result = np.zeros((len(values), 4), dtype=np.uint8)
+    lengths = _entry_lengths(values)
+    for channels in (3, 4):
+        idx = np.flatnonzero(lengths == channels)
+        if len(idx) == 0:
+            continue
+        result[idx, :channels] = np.clip(
+            np.array(values[idx].tolist(), dtype=np.float64), 0, 255
+        )
+        if channels == 3:
+            result[idx, 3] = alpha
+    return result
+
+
+def constant_color_array(color: tuple, n: int) -> np.ndarray:
+    """Read-only RGBA array in which every entry has the same color, without allocating one color per entry.
+
+    Args:
+        color (tuple): RGB(A) color.
+        n (int): number of entries.
+
+    Returns:
+        np.ndarray: Array of shape (n,4) with dtype uint8.
+    """
+    color = list(color)
+    if len(color) == 3:
+        color.append(255)
+    return np.broadcast_to(np.array(color, dtype=np.uint8), (n, 4))
+
+
+def rgba_pixels(image: np.ndarray, n_pixels: int) -> np.ndarray:
+    """Flattens an image into RGBA pixels and cuts or pads it with zeros to n_pixels pixels.
+
+    Args:
+        image (np.ndarray): image with shape (height, width) or (height, width, channels).
+        n_pixels (int): number of pixels of the result.
+
+    Returns:
+        np.ndarray: Array of shape (n_pixels,4) with dtype uint8. Pixels without alpha channel are opaque.
+    """
+    image = np.asarray(image, dtype=np.uint8)
+    pixels = image.reshape(image.shape[0] * image.shape[1], -1)
+    result = np.zeros((n_pixels, 4), dtype=np.uint8)
+    n = min(len(pixels), n_pixels)
+    if pixels.shape[1] <= 2:
+        # Grayscale (L) or grayscale with alpha (LA), the gray value becomes R, G and B.
+        pixels = np.concatenate(
+            [np.repeat(pixels[:, :1], 3, axis=1), pixels[:, 1:]], axis=1
+        )
+    result[:n, : min(pixels.shape[1], 4)] = pixels[:n, :4]
+    if pixels.shape[1] < 4:
+        result[:n, 3] = 255
+    return result
+
+
+def mask_colors(textures: np.ndarray, mask: np.ndarray, color: tuple) -> np.ndarray:
+    """Keeps the color of the masked pixels of several textures at once and paints every other pixel in a single color.
+
+    Args:
+        textures (np.ndarray): RGBA pixels of all textures with shape (L,N,4).
+        mask (np.ndarray): boolean mask of the pixels to keep with shape (N,).
+        color (tuple): RGBA color of the other pixels.
+
+    Returns:
+        np.ndarray: masked textures with shape (L,N,4) and dtype uint8.
+    """
+    color = np.array(color, dtype=np.uint8)
+    return np.where(mask[None, :, None], textures, color[None, None, :])
+
+
+def tile_name(name: str, tile: int) -> str:
+    """Name of a link texture tile. The first tile keeps the name of the texture so that projects with less than LINKS_PER_TILE links are unchanged.
+
+    Args:
+        name (str): name of the texture, e.g. "allXYZ".
+        tile (int): index of the tile.
+
+    Returns:
+        str: name of the tile, e.g. "allXYZ_1".
+    """
+    if tile == 0:
+        return name
+    return f"{name}_{tile}"
+
+
+def link_tile_count(n_links: int) -> int:
+    """Number of tiles needed to store all links. Always at least one.
+
+    Args:
+        n_links (int): number of links.
+
+    Returns:
+        int: number of tiles.
+    """
+    return max(1, -(-n_links // LINKS_PER_TILE))
+
+
+def pad_pixels(pixels: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Cuts or pads a pixel buffer with zeros and reshapes it into an image of the given dimensions.
+
+    Args:
+        pixels (np.ndarray): Pixel buffer of shape (N,C).
+        width (int): width of the image.
+        height (int): height of the image.
+
+    Returns:
+        np.ndarray: Array of shape (height, width, C)
+    """
+    image = np.zeros((width * height, pixels.shape[1]), dtype=np.uint8)
+    n = min(len(pixels), len(image))
+    image[:n] = pixels[:n]
+    return image.reshape(height, width, pixels.shape[1])
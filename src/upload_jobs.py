@@ -0,0 +1,296 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+import traceback
+import uuid
+
+from . import settings as st
+from .progress import ProgressReporter
+from .settings import log
+
+
+class UploadJob:
+    """State of a queued upload. Is updated by the worker running the upload and read by the status endpoint.
+
+    job_id (str): ID of the job.
+    notify (Callable, optional): called with the state of the job whenever it changes. Defaults to None.
+    on_progress (Callable, optional): called with every progress event of the job. Defaults to None.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    ERROR = "error"
+
+    def __init__(self, job_id: str, notify=None, on_progress=None) -> None:
+        self.id: str = job_id
+        self.status: str = UploadJob.QUEUED
+        self.stage: str = None
+        self.result: str = None
+        self.error: str = None
+        self.created: float = time.time()
+        self.finished: float = None
+        self.priority: int = 0
+        self.memory: int = 0
+        self.processes: int = 1
+        self.key: str = None
+        self.project: str = None
+        self.location: str = None
+        self.progress: ProgressReporter = ProgressReporter(self._progressed)
+        self._notify = notify
+        self._on_progress = on_progress
+
+    @property
+    def done(self) -> bool:
+        return self.status in (UploadJob.DONE, UploadJob.ERROR)
+
+    def set_stage(self, stage: str, total: int = None, unit: str = "items") -> None:
+        """Reports the stage the upload is in, see ProgressReporter.stage.
+
+        Args:
+            stage (str): name of the stage, e.g. "layouts".
+            total (int, optional): number of items of the stage. Defaults to None.
+            unit (str, optional): what the items are. Defaults to "items".
+        """
+        log.debug(f"Upload {self.id}: {stage}")
+        self.progress.stage(stage, total, unit)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress.event,
+            "processes": self.processes,
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+            "finished": self.finished,
+        }
+
+    def _progressed(self, event: dict) -> None:
+        stage_changed = event["stage"] != self.stage
+        self.stage = event["stage"]
+        if self._on_progress is not None:
+            try:
+                self._on_progress({"id": self.id, **event})
+            except Exception as e:
+                log.warning(f"Could not report progress of upload {self.id}: {e}")
+        if stage_changed:
+            self._changed()
+
+    def _changed(self) -> None:
+        if self._notify is None:
+            return
+        try:
+            self._notify(self.to_dict())
+        except Exception as e:
+            log.warning(f"Could not report state of upload {self.id}: {e}")
+
+
+def estimate_memory(n_nodes: int, n_links: int, n_layouts: int) -> int:
+    """Estimates the peak memory of an upload.
+
+    Args:
+        n_nodes (int): number of nodes.
+        n_links (int): number of links.
+        n_layouts (int): number of node layouts.
+
+    Returns:
+        int: estimated bytes.
+    """
+    return (
+        st.UPLOAD_BASE_BYTES
+        + n_nodes * max(1, n_layouts) * st.UPLOAD_BYTES_PER_NODE
+        + n_links * st.UPLOAD_BYTES_PER_LINK
+    )
+
+
+def _physical_memory() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, OSError, ValueError):
+        return 8 * 1024**3
+
+
+class UploadQueue:
+    """Schedules uploads on background threads, so that the request which submits an upload returns immediately. Running uploads share a budget of worker processes and memory. Queued uploads are started by priority as soon as their estimated memory fits into the budget, uploads which can never fit or arrive while the queue is full are rejected. Finished jobs are kept for settings.UPLOAD_JOB_TTL seconds so that their result can be fetched.
+
+    workers (int, optional): maximal number of uploads running at the same time. Defaults to settings.UPLOAD_WORKERS.
+    cpus (int, optional): worker processes shared by the running uploads. Defaults to settings.UPLOAD_CPU_BUDGET.
+    memory (int, optional): bytes shared by the running uploads. Defaults to settings.UPLOAD_MEMORY_BUDGET.
+    max_queued (int, optional): maximal number of waiting uploads. Defaults to settings.UPLOAD_MAX_QUEUED.
+    notify (Callable, optional): called with the state of a job whenever it changes, e.g. to emit it on the socket. Defaults to None.
+    on_progress (Callable, optional): called with every progress event of a job. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        cpus: int = None,
+        memory: int = None,
+        max_queued: int = None,
+        notify=None,
+        on_progress=None,
+    ) -> None:
+        if workers is None:
+            workers = st.UPLOAD_WORKERS
+        if cpus is None:
+            cpus = st.UPLOAD_CPU_BUDGET
+        if memory is None:
+            memory = st.UPLOAD_MEMORY_BUDGET or _physical_memory() // 2
+        if max_queued is None:
+            max_queued = st.UPLOAD_MAX_QUEUED
+        self.workers: int = max(1, workers)
+        self.cpus: int = max(1, cpus)
+        self.memory: int = memory
+        self.max_queued: int = max_queued
+        self.jobs: dict[str, UploadJob] = {}
+        self._notify = notify
+        self._on_progress = on_progress
+        self._cond = threading.Condition()
+        # Waiting uploads as (priority, sequence number, job, func, args, kwargs)
+        self._queue: list[tuple] = []
+        self._seq = itertools.count()
+        self._running = 0
+        self._used_cpus = 0
+        self._used_memory = 0
+
+    def submit(
+        self,
+        func,
+        *args,
+        priority: int = 0,
+        memory: int = 0,
+        key: str = None,
+        project: str = None,
+        **kwargs,
+    ) -> UploadJob:
+        """Queues an upload. func is called with the job as first argument and has to return the result shown to the user. The job's processes attribute holds the number of worker processes the upload may use.
+
+        Args:
+            func (Callable): function which runs the upload.
+            priority (int, optional): uploads with a lower value are started first. Defaults to 0.
+            memory (int, optional): estimated memory of the upload, see estimate_memory. Defaults to 0.
+            key (str, optional): content hash of the upload, see find. Defaults to None.
+            project (str, optional): name of the uploaded project. Defaults to None.
+
+        Returns:
+            UploadJob: the queued job. Its status is "error" if it was rejected.
+        """
+        job = UploadJob(str(uuid.uuid4()), self._notify, self._on_progress)
+        job.priority, job.memory = priority, memory
+        job.key, job.project = key, project
+        with self._cond:
+            self._prune()
+            self.jobs[job.id] = job
+            if memory > self.memory:
+                self._reject(
+                    job,
+                    f"The upload needs about {memory / 1024**3:.1f} GB of memory, but only {self.memory / 1024**3:.1f} GB are available.",
+                )
+            elif len(self._queue) >= self.max_queued:
+                self._reject(job, "Too many uploads are waiting. Please try again later.")
+            else:
+                heapq.heappush(
+                    self._queue, (priority, next(self._seq), job, func, args, kwargs)
+                )
+        job._changed()
+        self._dispatch()
+        return job
+
+    def get(self, job_id: str) -> UploadJob or None:
+        with self._cond:
+            return self.jobs.get(job_id)
+
+    def find(self, key: str, project: str = None) -> UploadJob or None:
+        """Finds the latest upload with the same content hash which did not fail.
+
+        Args:
+            key (str): content hash of the upload.
+            project (str, optional): if given, only the latest upload to this project which did not fail is considered, an upload followed by a different one is outdated. Defaults to None.
+
+        Returns:
+            UploadJob or None: the queued, running or finished upload.
+        """
+        with self._cond:
+            for job in reversed(list(self.jobs.values())):
+                if job.status == UploadJob.ERROR:
+                    continue
+                if project is None and job.key == key:
+                    return job
+                if project is not None and job.project == project:
+                    return job if job.key == key else None
+        return None
+
+    def shutdown(self) -> None:
+        """Waits until every queued upload is done."""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._queue and not self._running)
+
+    def _dispatch(self) -> None:
+        """Starts the waiting uploads with the highest priority as long as they fit into the budget. An upload which does not fit blocks the ones behind it, so that large uploads are not starved by smaller ones."""
+        started = []
+        with self._cond:
+            while self._queue and self._running < self.workers:
+                job = self._queue[0][2]
+                free_cpus = self.cpus - self._used_cpus
+                if free_cpus < 1 or self._used_memory + job.memory > self.memory:
+                    break
+                _, _, job, func, args, kwargs = heapq.heappop(self._queue)
+                # Share the processes evenly among the uploads which are running or waiting.
+                share = self.cpus // min(
+                    self.workers, self._running + 1 + len(self._queue)
+                )
+                job.processes = max(1, min(free_cpus, share))
+                self._running += 1
+                self._used_cpus += job.processes
+                self._used_memory += job.memory
+                started.append((job, func, args, kwargs))
+        for job, func, args, kwargs in started:
+            log.debug(
+                f"Starting upload {job.id} with {job.processes} processes and {job.memory / 1024**2:.0f} MB."
+            )
+            threading.Thread(
+                target=self._run,
+                args=(job, func, *args),
+                kwargs=kwargs,
+                name=f"CyExUpload-{job.id}",
+                daemon=True,
+            ).start()
+
+    def _run(self, job: UploadJob, func, *args, **kwargs) -> None:
+        job.status = UploadJob.RUNNING
+        job._changed()
+        try:
+            job.result = func(job, *args, **kwargs)
+            job.status = UploadJob.DONE
+        except Exception as e:
+            log.error(f"Upload {job.id} failed: {e}\n{traceback.format_exc()}")
+            job.error = str(e)
+            job.status = UploadJob.ERROR
+        finally:
+            job.finished = time.time()
+            with self._cond:
+                self._running -= 1
+                self._used_cpus -= job.processes
+                self._used_memory -= job.memory
+                self._cond.notify_all()
+        job._changed()
+        self._dispatch()
+
+    @staticmethod
+    def _reject(job: UploadJob, reason: str) -> None:
+        log.warning(f"Rejected upload {job.id}: {reason}")
+        job.status = UploadJob.ERROR
+        job.error = reason
+        job.finished = time.time()
+
+    def _prune(self) -> None:
+        expired = time.time() - st.UPLOAD_JOB_TTL
+        for job_id in [
+            j.id for j in self.jobs.values() if j.done and j.finished < expired
+        ]:
+            del self.jobs[job_id]
@@ -1,7 +1,8 @@
+import copy
 import os
 import sys
 import warnings
-from multiprocessing import Manager, Pool, Process
+from functools import partial
 
 import numpy as np
 import pandas as pd
@@ -14,6 +15,9 @@ import GlobalData as GD
 from PIL import Image
 from project import COLOR, DEFAULT_PFILE, NODE
 
+from . import settings as st
+from . import sidecar
+from . import textures as tex
 from .classes import Evidences as EV
 from .classes import LayoutTags as LT
 from .classes import LinkTags as LiT
@@ -22,8 +26,12 @@ from .classes import ProjectTag as PT
 from .classes import StringTags as ST
 from .classes import VRNetzElements as VRNE
 from .cyEx_project import CyExProject
+from .manifest import ArtifactManifest, digest
+from .progress import ProgressReporter, advance, stage
+from .texture_engine import TextureEngine
 from .settings import log
 from .util import clean_filename
+from .writer import ArtifactWriter
 
 warnings.filterwarnings("ignore")
 
@@ -32,6 +40,21 @@ def os_join(*args):
     return os.path.join(*args)
 
 
+def tile_image(pixels: np.ndarray, width: int, height: int, mode: str) -> Image.Image:
+    """Pads a pixel buffer to the size of a texture.
+
+    Args:
+        pixels (np.ndarray): pixel buffer of shape (N,C).
+        width (int): width of the texture.
+        height (int): height of the texture.
+        mode (str): PIL image mode, e.g. "RGB".
+
+    Returns:
+        Image.Image: texture containing the pixels.
+    """
+    return Image.fromarray(tex.pad_pixels(pixels, width, height), mode)
+
+
 class Uploader:
     """Uploader class to upload VRNetz files.
     network (dict): network to be uploaded
@@ -45,10 +68,10 @@ class Uploader:
         project: CyExProject,
     ) -> None:
         self.project = project
-        if self.project.overwrite:
-            self.project.remove()
-        if self.project.pfile is None:
-            self.project.pfile = DEFAULT_PFILE
+        # Artifacts of a previous upload are kept and only regenerated if their inputs changed.
+        self.manifest = ArtifactManifest(self.project.location)
+        if self.project.overwrite or self.project.pfile is None:
+            self.project.pfile = copy.deepcopy(DEFAULT_PFILE)
         # TODO: Consider removing
         # if self.stringify:
         #     self.project.pfile["network"] = "string"
@@ -57,7 +80,7 @@ class Uploader:
         self.project.pfile["linkcount"] = 0
         self.project.pfile["labelcount"] = 0
         self.project.pfile["name"] = self.project.name
-        self.MAX_NUM_LINKS = 262144
+        self.LINKS_PER_TILE = tex.LINKS_PER_TILE
 
     def makeProjectFolders(self) -> None:
         """Creates the project folders and writes empty pfile and names file."""
@@ -71,58 +94,62 @@ class Uploader:
     def handle_link_layout(
         self,
         layout: str,
-        all_colors: pd.DataFrame,
-        start: pd.Series,
-        end: pd.Series,
+        n_links: int,
+        colors: np.ndarray,
+        xyz_pixels: np.ndarray,
         path: str,
         height: int,
     ) -> dict:
         """
-        Handle a respective link layout and generate the respective bitmaps.
+        Handle a respective link layout and generate the respective bitmaps. Links which do not fit into a single texture are split into tiles of textures.LINKS_PER_TILE links. The textures are not written but returned as artifacts, see write_artifacts.
 
         Args:
             layout (str): layout name.
-            all_colors (pd.DataFrame): contains all colors for the links.
-            start (pd.Series): contains all start positions for the links.
-            end (pd.Series): contains all end positions for the links.
+            n_links (int): number of links. If 0, no position texture is created.
+            colors (np.ndarray): RGBA colors of the links with shape (L,4). If None, the color texture is unchanged and not written.
+            xyz_pixels (np.ndarray): interleaved start and end pixels of the links with shape (2L,3). If None, the position texture is unchanged and not written.
             path (str): path to the project folder.
             height (int): height of the image.
 
         Returns:
-            dict: contains the status message and the names of the generated files.
+            dict: contains the status message, the names of the generated files, their tiles and the artifacts to write.
 
         """
-        colors = all_colors[: self.MAX_NUM_LINKS].copy()
         layout_name = layout.replace("_col", "")
-        colors = colors.swifter.progress_bar(False).apply(
-            lambda x: x
-            if x != (0, 0, 0, 0)
-            and x != "<NA>"
-            and x != np.nan
-            and not isinstance(x, float)
-            else pd.NA
-        )
-        colors = colors.fillna(0)
-        image = Image.new("RGBA", (512, height))
         rgb = f"{layout_name}RGB"
         xyz = None
-        image.putdata(colors)
-        image.save(os_join(path, "linksRGB", f"{rgb}.png"))
-
-        if start.any() or end.any():
-            start = start.fillna(0)
-            end = end.fillna(0)
-
-            # Cut data frame to max number of links
+        n_tiles = tex.link_tile_count(n_links)
+        rgb_tiles = [tex.tile_name(rgb, t) for t in range(n_tiles)]
+        xyz_tiles = []
+        artifacts = []
+        for t, name in enumerate(rgb_tiles):
+            if colors is None:
+                break
+            tile = colors[t * self.LINKS_PER_TILE : (t + 1) * self.LINKS_PER_TILE]
+            artifacts.append(
+                (
+                    f"linksRGB/{name}.png",
+                    partial(tile_image, tile, tex.LINK_RGB_WIDTH, height, "RGBA"),
+                    os_join(path, "linksRGB", f"{name}.png"),
+                )
+            )
 
-            texture = pd.concat([start, end]).sort_index(kind="stable")[
-                : self.MAX_NUM_LINKS
-            ]  # sort the entries in an alternating fashion
-            texture = texture.to_numpy()
+        if n_links > 0:
             xyz = f"{layout_name}XYZ"
-            image = Image.new("RGB", (1024, height))
-            image.putdata(texture)
-            image.save(os_join(path, "links", f"{xyz}.bmp"))
+            xyz_tiles = [tex.tile_name(xyz, t) for t in range(n_tiles)]
+            for t, name in enumerate(xyz_tiles):
+                if xyz_pixels is None:
+                    break
+                tile = xyz_pixels[
+                    2 * t * self.LINKS_PER_TILE : 2 * (t + 1) * self.LINKS_PER_TILE
+                ]
+                artifacts.append(
+                    (
+                        f"links/{name}.bmp",
+                        partial(tile_image, tile, tex.LINK_TEX_WIDTH, height, "RGB"),
+                        os_join(path, "links", f"{name}.bmp"),
+                    )
+                )
 
         res = {
             "out": (
@@ -132,6 +159,9 @@ class Uploader:
             ),
             "rgb": rgb,
             "xyz": xyz,
+            "rgb_tiles": rgb_tiles,
+            "xyz_tiles": xyz_tiles,
+            "artifacts": artifacts,
         }
         return res
 
@@ -139,68 +169,99 @@ class Uploader:
         self,
         links: dict,
         layouts: list,
-        return_dict: dict = None,
-        parallel: bool = False,
-    ) -> None or list[dict]:
-        """Generate a Link texture from a dictionary of edges.
+        engine: TextureEngine = None,
+        writer: ArtifactWriter = None,
+        progress: ProgressReporter = None,
+    ) -> list[dict]:
+        """Generate a Link texture from a dictionary of edges. Textures whose links and colors did not change since the last upload are neither encoded nor written.
 
         Args:
             links (dict): contains all links of the network.
             layouts (list): contains all layouts for which the output should be generated.
+            engine (TextureEngine, optional): encoder of the start and end pixels. If None, they are encoded in this process. Defaults to None.
+            writer (ArtifactWriter, optional): output stage to which the textures of each layout are queued as soon as they are encoded. If None, the textures are written right away. Defaults to None.
+            progress (ProgressReporter, optional): reports each finished layout. Defaults to None.
 
         Returns:
-            str: status message to report the status of the execution.
+            list[dict]: status messages and names of the generated textures of each layout.
         """
         if not isinstance(links, pd.DataFrame):
             links = pd.DataFrame(links)
-        # for layout in layouts:
-        #     links[layout] = [None for _ in range(len(links))]
-        # links["start_tex"] = [None for _ in range(len(links))]
-        # links["end_tex"] = [None for _ in range(len(links))]
-
-        # filtered = links[[LiT.id, LiT.start, LiT.end]]
-        # self.links[VRNE.links] += filtered.to_dict(orient="records")
+        if engine is None:
+            engine = TextureEngine(processes=1)
         log.debug("Handling Links..")
-        height = 512
+        height = tex.LINK_TEX_HEIGHT
         path = self.project.location
+        n_links = len(links)
+        n_tiles = tex.link_tile_count(n_links)
 
-        tmp = links.copy()
-        tmp["start_pix"] = links[LiT.start].apply(
-            lambda x: (x % 128, x // 128 % 128, x // 16384)
-            if not pd.isnull(x)
-            else (0, 0, 0)
-        )
-        tmp["end_pix"] = links[LiT.end].apply(
-            lambda x: (x % 128, x // 128 % 128, x // 16384)
-            if not pd.isnull(x)
-            else (0, 0, 0)
-        )
-        path = self.project.location
+        def tiles(name: str, folder: str, ext: str) -> list[str]:
+            return [f"{folder}/{tex.tile_name(name, t)}.{ext}" for t in range(n_tiles)]
+
+        starts = ends = np.empty(0)
+        if n_links > 0:
+            starts = pd.to_numeric(links[LiT.start], errors="coerce").to_numpy(np.float64)
+            ends = pd.to_numeric(links[LiT.end], errors="coerce").to_numpy(np.float64)
+        xyz_digest = digest(starts, ends, height)
+
+        constant_colors = self.project.link_colors
         layouts = [c for c in links.columns if c.endswith("col")]
+        layouts += [c for c in constant_colors if c not in layouts]
         log.debug(layouts)
-        args = []
+        stage(progress, "link textures", total=len(layouts), unit="layouts")
+        todo = {}
         for lay in layouts:
-            layout = tmp[lay].copy()
-            args.append(
-                (
-                    lay,
-                    layout,
-                    tmp["start_pix"],
-                    tmp["end_pix"],
-                    path,
-                    height,
-                )
+            layout_name = lay.replace("_col", "")
+            if lay in links.columns:
+                colors = tex.color_array(links[lay])
+            else:
+                colors = tex.constant_color_array(constant_colors[lay], n_links)
+            if self.manifest.check(
+                tiles(f"{layout_name}RGB", "linksRGB", "png"),
+                digest(colors, height),
+            ):
+                colors = None
+            xyz_unchanged = n_links == 0 or self.manifest.check(
+                tiles(f"{layout_name}XYZ", "links", "bmp"), xyz_digest
             )
-        if parallel:
-            pool = Pool()
-            output = pool.starmap(self.handle_link_layout, args)
-            pool.close()
-            return_dict["links"] = output
-        else:
-            output = []
-            for arg in args:
-                output.append(self.handle_link_layout(*arg))
-            return output
+            todo[lay] = (colors, not xyz_unchanged)
+
+        xyz_pixels = None
+        if any(write_xyz for _, write_xyz in todo.values()):
+            xyz_pixels = engine.encode_links(starts, ends)
+        output = []
+        for lay, (colors, write_xyz) in todo.items():
+            res = self.handle_link_layout(
+                lay,
+                n_links,
+                colors,
+                xyz_pixels if write_xyz else None,
+                path,
+                height,
+            )
+            output.append(self.write_artifacts(res, writer))
+            advance(progress, layout=lay, links=n_links)
+        return output
+
+    @staticmethod
+    def write_artifacts(res: dict, writer: ArtifactWriter = None) -> dict:
+        """Writes the textures returned by handle_node_layout or handle_link_layout.
+
+        Args:
+            res (dict): result of a handled layout. Its artifacts are removed from it.
+            writer (ArtifactWriter, optional): output stage to queue the textures to. If None, they are written right away. Defaults to None.
+
+        Returns:
+            dict: the result without its artifacts.
+        """
+        for name, image, file in res.pop("artifacts", []):
+            if writer is not None:
+                writer.save_image(name, image, file)
+                continue
+            if callable(image):
+                image = image()
+            image.save(file)
+        return res
 
     def stringify_project(self, links: bool = True, nodes: bool = True):
         """Only adds the evidences to pfile layouts.
@@ -224,72 +285,59 @@ class Uploader:
         self.project.write_pfile()
 
     def handle_node_layout(
-        self, layout: str, pos: pd.Series, color: pd.Series, path: str, hight: int
+        self,
+        layout: str,
+        high: np.ndarray,
+        low: np.ndarray,
+        colors: np.ndarray,
+        path: str,
+        hight: int,
     ) -> dict:
-        """Handles the creation of a node layout.
+        """Handles the creation of a node layout. Layouts ending with "_pos" create position textures, layouts ending with "_col" a color texture.
 
         Args:
             layout (str): layout name.
-            pos (pd.Series): coordinates of the nodes.
-            color (pd.Series): color of the nodes.
+            high (np.ndarray): high bytes of the node coordinates with shape (hight,128,3). If None, the position textures are unchanged and not written.
+            low (np.ndarray): low bytes of the node coordinates with shape (hight,128,3).
+            colors (np.ndarray): color of the nodes with shape (hight,128,4). If None, the color texture is unchanged and not written.
             path (str): path to the project folder.
             hight (int): hight of the image.
 
         Returns:
-            dict: status message to report the status of the execution.
+            dict: status message to report the status of the execution and the artifacts to write.
         """
-        layout_name = layout.replace("_pos", "")
+        layout_name = layout.replace("_pos", "").replace("_col", "")
         xyz = None
         rgb = None
-        if pos is not None and pos.any():
-            pos = pos.swifter.progress_bar(False).apply(
-                lambda x: [int(float(value) * 65280) for value in x]
-            )
-
-            t_high = (
-                pos.swifter.progress_bar(False)
-                .apply(lambda x: tuple(value // 255 for value in x))
-                .fillna(0)
-            )
-            t_low = (
-                pos.swifter.progress_bar(False)
-                .apply(lambda x: tuple(value % 255 for value in x))
-                .fillna(0)
-            )
-
-            images = {k: Image.new("RGB", (128, hight)) for k in ["high", "low"]}
-            images["layoutsRGB"] = Image.new("RGBA", (128, hight))
-
-            for key, data in zip(["high", "low"], [t_high, t_low]):
-                images[key].putdata(data)
-            images["high"]
-
+        artifacts = []
+        if layout.endswith("_pos"):
             xyz = f"{layout_name}XYZ"
-            images["high"].save(os_join(path, "layouts", f"{xyz}.bmp"))
-            images["low"].save(os_join(path, "layoutsl", f"{xyz}l.bmp"))
-
-        if color is not None and color.any():
-            color = color.fillna(0)
-
-            def set_color(x):
-                if len(x) == 4:
-                    return tuple(
-                        x,
-                    )
-                elif x == 0:
-                    return x
-                return tuple(
-                    x
-                    + [
-                        255 // 2,
-                    ],
+        if high is not None:
+            artifacts.append(
+                (
+                    f"layouts/{xyz}.bmp",
+                    Image.fromarray(high, "RGB"),
+                    os_join(path, "layouts", f"{xyz}.bmp"),
                 )
+            )
+            artifacts.append(
+                (
+                    f"layoutsl/{xyz}l.bmp",
+                    Image.fromarray(low, "RGB"),
+                    os_join(path, "layoutsl", f"{xyz}l.bmp"),
+                )
+            )
 
-            color = color.swifter.progress_bar(False).apply(set_color)
-            images["layoutsRGB"].putdata(color)
-
+        if layout.endswith("_col"):
             rgb = f"{layout_name}RGB"
-            images["layoutsRGB"].save(os_join(path, "layoutsRGB", f"{rgb}.png"))
+        if colors is not None:
+            artifacts.append(
+                (
+                    f"layoutsRGB/{rgb}.png",
+                    Image.fromarray(colors, "RGBA"),
+                    os_join(path, "layoutsRGB", f"{rgb}.png"),
+                )
+            )
 
         res = {
             "out": '<br><a style="color:green;">SUCCESS </a>'
@@ -297,6 +345,7 @@ class Uploader:
             + " Node Textures Created",
             "rgb": rgb,
             "xyz": xyz,
+            "artifacts": artifacts,
         }
         return res
 
@@ -305,77 +354,92 @@ class Uploader:
         nodes: list[dict],
         layouts: list[str],
         skip_attr: list[str] = ["layouts"],
-        return_dict: dict = None,
-        parallel: bool = False,
-    ) -> None or list[dict]:
-        """Extract all Node data from the network.
+        engine: TextureEngine = None,
+        writer: ArtifactWriter = None,
+        progress: ProgressReporter = None,
+    ) -> list[dict]:
+        """Extract all Node data from the network. Textures whose coordinates or colors did not change since the last upload are neither encoded nor written.
 
         Args:
             nodes (list[dict]): Contains all nodes of the network as key, value pairs.
             skip_attr (list[str]): Contains all attributes that should be skipped.
             layouts (list[str]): Contains all layouts for which positions should be extracted.
+            engine (TextureEngine, optional): encoder of the node coordinates. If None, they are encoded in this process. Defaults to None.
+            writer (ArtifactWriter, optional): output stage to which the textures of each layout are queued as soon as they are encoded. If None, the textures are written right away. Defaults to None.
+            progress (ProgressReporter, optional): reports each finished layout. Defaults to None.
+
+        Returns:
+            list[dict]: status messages and names of the generated textures of each layout.
         """
         if not isinstance(nodes, pd.DataFrame):
             nodes = pd.DataFrame(nodes)
-        # nodes = self.change_to_universal_attr(nodes)
-        # filtered = nodes.drop(columns=skip_attr)
-        # self.nodes[VRNE.nodes] += filtered.to_dict(orient="records")
-        n = len(nodes)
-        hight = 128 * (int(n / 16384) + 1)
+        if engine is None:
+            engine = TextureEngine(processes=1)
+        hight = tex.node_tex_height(len(nodes))
 
         path = self.project.location
         layouts = [c for c in nodes.columns if c.endswith("_pos")]
         colors = [c for c in nodes.columns if c.endswith("_col")]
-        n = len(layouts)
-        if len(colors) > n:
-            n = len(colors)
-        args = []
-
-        for idx in range(n):
-            if idx < len(layouts):
-                lay = layouts[idx]
-                layout = nodes[lay].copy()
-            else:
-                layout = None
-                lay = None
-            if idx < len(colors):
-                color = colors[idx]
-                color = nodes[color].copy()
+        stage(
+            progress, "node textures", total=len(layouts) + len(colors), unit="layouts"
+        )
+
+        output = []
+        stale = {}
+        for lay in layouts:
+            pos = tex.position_array(nodes[lay])
+            if np.isnan(pos).all():
+                # Skip layouts without any coordinate
+                advance(progress, layout=lay, skipped=True)
+                continue
+            xyz = f'{lay.replace("_pos", "")}XYZ'
+            if self.manifest.check(
+                [f"layouts/{xyz}.bmp", f"layoutsl/{xyz}l.bmp"], digest(pos, hight)
+            ):
+                res = self.handle_node_layout(lay, None, None, None, path, hight)
+                output.append(self.write_artifacts(res, writer))
+                advance(progress, layout=lay, cached=True)
             else:
-                color = None
-            args.append(
-                (
-                    lay,
-                    layout,
-                    color,
-                    path,
-                    hight,
+                stale[lay] = pos
+
+        if stale:
+            high, low = engine.encode_positions(np.stack(list(stale.values())), hight)
+            for idx, lay in enumerate(stale):
+                res = self.handle_node_layout(
+                    lay, high[idx], low[idx], None, path, hight
                 )
-            )
-        if parallel:
-            n = len(layouts)
-            pool = Pool(n)
-            output = pool.starmap(
-                self.handle_node_layout,
-                args,
-            )
-            pool.close()
-            return_dict["nodes"] = output
-        else:
-            output = []
-            for arg in args:
-                output.append(self.handle_node_layout(*arg))
-            return output
+                output.append(self.write_artifacts(res, writer))
+                advance(progress, layout=lay, nodes=len(nodes))
+
+        for lay in colors:
+            color = tex.color_array(nodes[lay], alpha=255 // 2)
+            if not color.any():
+                advance(progress, layout=lay, skipped=True)
+                continue
+            rgb = f'{lay.replace("_col", "")}RGB'
+            if self.manifest.check([f"layoutsRGB/{rgb}.png"], digest(color, hight)):
+                color = None
+            else:
+                color = tex.pad_pixels(color, tex.NODE_TEX_WIDTH, hight)
+            res = self.handle_node_layout(lay, None, None, color, path, hight)
+            output.append(self.write_artifacts(res, writer))
+            advance(progress, layout=lay, nodes=len(nodes))
+        return output
 
     def upload_files(
         self,
         parallel: bool = True,
+        processes: int = None,
+        progress: ProgressReporter = None,
     ) -> str:
         """Generates textures and upload the needed network files. If created_2d_layout is True, it will create 2d layouts of the network one based on the cytoscape coordinates and one based on the new coordinated that come from the 3D layout without the z-coordinate.
         Furthermore, for each STRING evidence a edge texture with the respective color will be generated. If it is not a STRING network, only a single edge layout called "any" is created.
 
         Args:
             network (dict): Has to have the following keys: nodes, links, node_layouts, link_layouts
+            parallel (bool, optional): Whether to encode the textures on worker processes. Defaults to True.
+            processes (int, optional): Number of worker processes used to encode the textures. Defaults to settings.TEXTURE_PROCESSES.
+            progress (ProgressReporter, optional): reports the texture and writing stages. Defaults to None.
 
         Returns:
             str: status message of the upload
@@ -387,7 +451,8 @@ class Uploader:
         prolist = GD.listProjects()
 
         if self.project.overwrite:
-            self.makeProjectFolders()
+            if not os.path.isdir(self.project.location):
+                self.makeProjectFolders()
         else:
             if project in prolist:
                 log.warning(f"Project: {project} already exists.")
@@ -409,13 +474,59 @@ class Uploader:
             self.project.names[NT.display_name] = [
                 [n] for n in nodes[NT.display_name].tolist()
             ]
-        if parallel:
-            node_tex_res, link_tex_res = self.parallel_process(
-                nodes, links, n_lay, l_lay
+        self.manifest.begin()
+        with ArtifactWriter() as writer:
+            state = self.encode_textures(
+                nodes, links, n_lay, l_lay, writer, parallel, processes, progress
             )
-        else:
-            node_tex_res = self.make_node_tex(nodes, n_lay)
-            link_tex_res = self.make_link_tex(links, l_lay)
+            self.write_jsons(writer)
+            writer.wait(progress)
+        self.manifest.remove_stale()
+        self.manifest.save()
+        # #TODO:Consider Removing
+        # if self.stringify:
+        #     self.stringify_project()
+        try:
+            GD.loadGD()
+        except Exception as e:
+            log.error(e)
+            pass
+
+        return state
+
+    def encode_textures(
+        self,
+        nodes: pd.DataFrame,
+        links: pd.DataFrame,
+        n_lay: list,
+        l_lay: list,
+        writer: ArtifactWriter,
+        parallel: bool = True,
+        processes: int = None,
+        progress: ProgressReporter = None,
+    ) -> str:
+        """Encodes all node and link textures, queues them to the writer and adds them to the pfile.
+
+        Args:
+            nodes (pd.DataFrame): nodes of the network.
+            links (pd.DataFrame): links of the network.
+            n_lay (list): node layouts.
+            l_lay (list): link layouts.
+            writer (ArtifactWriter): output stage to which the textures are queued.
+            parallel (bool, optional): Whether to encode the textures on the worker processes of a TextureEngine. Defaults to True.
+            processes (int, optional): Number of worker processes of the TextureEngine. Defaults to settings.TEXTURE_PROCESSES.
+            progress (ProgressReporter, optional): reports each encoded layout. Defaults to None.
+
+        Returns:
+            str: status message of the encoded textures.
+        """
+        engine = TextureEngine(processes=processes if parallel else 1)
+        node_tex_res = self.make_node_tex(
+            nodes, n_lay, engine=engine, writer=writer, progress=progress
+        )
+        link_tex_res = self.make_link_tex(
+            links, l_lay, engine=engine, writer=writer, progress=progress
+        )
         state = ""
         for res in node_tex_res:
             state += res["out"]
@@ -430,6 +541,21 @@ class Uploader:
                 self.project.pfile["links"].append(res["xyz"])
             if res["rgb"] and res["rgb"] not in self.project.pfile["linksRGB"]:
                 self.project.pfile["linksRGB"].append(res["rgb"])
+            link_tiles = self.project.pfile.setdefault(st.LINK_TILE_KEY, {})
+            for tex_name, tiles in [
+                (res["xyz"], res["xyz_tiles"]),
+                (res["rgb"], res["rgb_tiles"]),
+            ]:
+                if tex_name:
+                    link_tiles[tex_name] = tiles
+        return state
+
+    def write_jsons(self, writer: ArtifactWriter) -> None:
+        """Prepares the nodes, links, names and pfile JSONs of the project and queues them to the writer.
+
+        Args:
+            writer (ArtifactWriter): output stage to which the JSON files are queued.
+        """
         nodes = self.project.network.get(VRNE.nodes, [])
 
         if isinstance(nodes, pd.DataFrame):
@@ -465,25 +591,24 @@ class Uploader:
 
         nodes = nodes[[c for c in nodes.columns if not c.endswith(("_pos", "_col"))]]
         links = links[[c for c in links.columns if not c.endswith(("_col",))]]
-        self.project.nodes = {
-            "nodes": [v.dropna().to_dict() for k, v in nodes.iterrows()]
-        }
-        self.project.links = {
-            "links": [v.dropna().to_dict() for k, v in links.iterrows()]
-        }
         self.project.pfile["nodecount"] = len(nodes)
         self.project.pfile["linkcount"] = len(links)
-        self.project.write_all_jsons()
-        # #TODO:Consider Removing
-        # if self.stringify:
-        #     self.stringify_project()
-        try:
-            GD.loadGD()
-        except Exception as e:
-            log.error(e)
-            pass
-
-        return state
+        location = self.project.location
+        # Nodes and links are streamed column wise instead of building a dict per row. Their sidecar index allows reading single records later on.
+        writer.submit("nodes.json", sidecar.write_indexed, location, "nodes", nodes)
+        writer.submit(
+            "links.json",
+            sidecar.write_indexed,
+            location,
+            "links",
+            links,
+            sidecar.link_columns(links),
+        )
+        for name, data in [
+            ("names.json", self.project.names),
+            ("pfile.json", self.project.pfile),
+        ]:
+            writer.write_json(name, data, os_join(location, name))
 
     def color_nodes(
         self,
@@ -560,73 +685,51 @@ class Uploader:
             ]
         }
 
-        nodes = nodes.drop(
-            columns=[c for c in nodes.columns if c not in [NT.node_color, NT.size]]
-        )
+        self.mask_color_layouts(nodes, layouts)
+        self.project.write_all_jsons()
 
-        def mask_nodes(project: Project, nodes: pd.DataFrame, selected_nodes: list):
-            # MASK WHICH HIGHLIGHTS NODES THAT ARE SELECTED
-            NODE_BITMAP_SIZE = 128
-            nodes = pd.DataFrame(project.get_nodes()["nodes"])
-            mask = np.zeros((NODE_BITMAP_SIZE, NODE_BITMAP_SIZE, 4))
-            nodes = nodes[nodes["id"].isin(selected_nodes)].copy()
-            x, y = nodes["id"] // NODE_BITMAP_SIZE, nodes["id"] % NODE_BITMAP_SIZE
-            x, y = x.astype(int), y.astype(int)
-            mask[x, y, :] = 1
-            return mask
-
-        mask = mask_nodes(self.project, nodes, mapped_nodes.index)
-        for lay in layouts:
-            layout_bmp = self.project.load_bitmap(lay, NODE, COLOR, True)
-            selected = np.zeros_like(layout_bmp)
-            selected[layout_bmp > 0] = mask[layout_bmp > 0]
-            # Multiply the two images element-wise
-            if len(np.unique(layout_bmp)) >= 1:
-                # If not all colors are the same, use the color of the selected nodes.
-                result = layout_bmp * selected
-            else:
-                # Else mask selected nodes red.
-                result[:, :, :3] = [255, 0, 0]
-
-            non_zero = np.nonzero(selected)
-            NOT_SELECTED = (
-                255,
-                255,
-                255,
-                10,
+    def mask_color_layouts(self, nodes: pd.DataFrame, layouts: list[str]) -> None:
+        """Highlights the mapped nodes, i.e. the nodes with a size, in all color layouts at once. Mapped nodes keep their color, every other node is colored in the mapping color and glows less. Additionally writes the "Mapped" color layout, which colors each node by its own color.
+
+        Args:
+            nodes (pd.DataFrame): Nodes of the network in the order of the textures.
+            layouts (list[str]): Color layouts to mask.
+        """
+        n_pixels = tex.NODE_TEX_WIDTH * tex.node_tex_height(len(nodes))
+        hight = n_pixels // tex.NODE_TEX_WIDTH
+        sizes = pd.to_numeric(nodes[NT.size], errors="coerce").to_numpy(np.float64)
+        mapped = np.zeros(n_pixels, dtype=bool)
+        mapped[: len(nodes)] = ~np.isnan(sizes)
+
+        if layouts:
+            # All color layouts are masked as one stacked array.
+            textures = np.stack(
+                [
+                    tex.rgba_pixels(
+                        self.project.load_bitmap(lay, NODE, COLOR, True), n_pixels
+                    )
+                    for lay in layouts
+                ]
             )
-            max_row = np.max(non_zero[0])
-            non_zero = np.nonzero(selected[max_row])
-            max_col = np.max(non_zero[0])
-            not_selected = ~selected
-            not_selected[:max_row, :, :] = NOT_SELECTED
-            not_selected[max_row, :max_col, :] = NOT_SELECTED
-            not_selected[max_row, max_col:, :] = NOT_SELECTED
-            not_selected[max_row + 1 :, :, :] = NOT_SELECTED
-
-            result = result + not_selected
-            bmp = Image.fromarray(np.uint8(result))
-            self.project.write_bitmap(bmp, lay, NODE, COLOR)
+            unmapped = (*st._MAPPING_ARBITARY_COLOR, st.UNMAPPED_LAYOUT_ALPHA)
+            masked = tex.mask_colors(textures, mapped, unmapped)
+            for lay, pixels in zip(layouts, masked):
+                image = Image.fromarray(
+                    pixels.reshape(hight, tex.NODE_TEX_WIDTH, 4), "RGBA"
+                )
+                self.project.write_bitmap(image, lay, NODE, COLOR)
 
         # color layout which just highlights the mapped nodes
-        mapped_nodes[NT.node_color] = mapped_nodes.swifter.progress_bar(False).apply(
-            lambda x: tuple(x[NT.node_color] + [int(255 * x[NT.size])]), axis=1
+        colors = tex.color_array(nodes[NT.node_color])
+        colors[:, 3] = np.where(
+            mapped[: len(nodes)],
+            np.clip(np.nan_to_num(sizes) * 255, 0, 255).astype(np.uint8),
+            st.UNMAPPED_ALPHA,
         )
-
-        not_mappend[NT.node_color] = (
-            not_mappend[NT.node_color]
-            .swifter.progress_bar(False)
-            .apply(lambda x: tuple(x + [50]))
-        )
-        nodes = pd.concat([mapped_nodes, not_mappend])
-        nodes = nodes.sort_index()
-        layout_bmp = Image.new("RGBA", (128, 128))
-        layout_bmp.putdata(nodes[NT.node_color])
-        self.project.write_bitmap(layout_bmp, "Mapped", NODE, COLOR)
+        image = Image.fromarray(tex.pad_pixels(colors, tex.NODE_TEX_WIDTH, hight), "RGBA")
+        self.project.write_bitmap(image, "Mapped", NODE, COLOR)
         self.project.add_node_color("Mapped")
 
-        self.project.write_all_jsons()
-
     def update_link_textures(self, links, l_lay, target_links, target_links_rgb):
         self.make_link_tex(links, l_lay)
         self.stringify_project(nodes=False)
@@ -656,44 +759,3 @@ class Uploader:
             if s_attr in nodes.columns:
                 nodes.rename(columns={s_attr: u_att}, inplace=True)
         return nodes
-
-    def parallel_process(self, nodes, links, n_lay, l_lay):
-        manager = Manager()
-        return_dict = manager.dict()
-        processes = []
-        if len(n_lay) > os.cpu_count():
-            log.debug("Parallel node layout creation", flush=True)
-            np = Process(
-                target=self.make_node_tex,
-                args=(
-                    nodes,
-                    n_lay,
-                ),
-                kwargs={"return_dict": return_dict, "parallel": True},
-            )
-            processes.append(np)
-        else:
-            return_dict["nodes"] = self.make_node_tex(nodes, n_lay)
-        if len(l_lay) > os.cpu_count():
-            log.debug("Parallel link layout Creation", flush=True)
-            lp = Process(
-                target=self.make_link_tex,
-                args=(
-                    links,
-                    l_lay,
-                ),
-                kwargs={"return_dict": return_dict, "parallel": True},
-            )
-            processes.append(lp)
-        else:
-            return_dict["links"] = self.make_link_tex(links, l_lay)
-
-        for p in processes:
-            p.start()
-
-        for p in processes:
-            p.join()
-
-        node_tex_res = return_dict["nodes"]
-        link_tex_res = return_dict["links"]
-        return node_tex_res, link_tex_res
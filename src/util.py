@@ -1,7 +1,6 @@
-import glob
 import json
 import os
-import shutil
+import threading
 
 try:
     import GlobalData as GD
@@ -9,12 +8,12 @@ except ModuleNotFoundError:
     pass
 
 import flask
-import networkx as nx
 
 from . import settings as st
 from .classes import LayoutAlgorithms
 from .classes import LayoutTags as LT
 from .classes import NodeTags as NT
+from .project_sync import sync_in_background
 from .settings import log
 
 
@@ -54,7 +53,7 @@ def get_algo_variables(algo: str, form: dict) -> dict:
         return {}
 
 
-def prepare_networkx_network(G: nx.Graph, positions: dict = None) -> tuple[dict, dict]:
+def prepare_networkx_network(G, positions: dict = None) -> tuple[dict, dict]:
     """Transforms a basic networkx graph into a correct data structure to be uploaded by the Cytoscape uploader. If the positions are not given, the positions are calculated using the spring layout algorithm of networkx.
 
     Args:
@@ -65,6 +64,8 @@ def prepare_networkx_network(G: nx.Graph, positions: dict = None) -> tuple[dict,
         tuple[dict, dict]: First element contains the node data, second element contains the edge data.
     """
     if positions is None:
+        import networkx as nx
+
         positions = nx.spring_layout(G, dim=3)
     nodes_data = {}
     edges_data = {}
@@ -125,22 +126,21 @@ def prepare_uploader() -> None:
     """Adds extension specific data to GD.sessionData. Setup function to prepare the CyEx Uploader."""
     strinEx_config = {}
 
-    strinEx_config["layoutAlgos"] = LayoutAlgorithms.all_algos
+    # The upload page lists algorithms.available_algorithms() when it is rendered.
+    # strinEx_config["layoutAlgos"] = available_algorithms()
     strinEx_config["actAlgo"] = LayoutAlgorithms.spring
     # strinEx_config["organisms"] = Organisms.all_organisms
 
     # GD.sessionData["stringex"] = strinEx_config
 
 
-def move_on_boot() -> None:
-    """Moves the projects directories of the interactomes to the projects directory of the VRNetzer backend."""
-    for _dir in glob.glob(os.path.join(st._THIS_EXT_STATIC_PATH, "projects", "*")):
-        dir_name = os.path.basename(_dir)
-        if os.path.isdir(_dir) and not os.path.isdir(
-            os.path.join(st._PROJECTS_PATH, dir_name)
-        ):
-            log.debug(f"Copying {_dir}")
-            shutil.copytree(_dir, os.path.join(st._PROJECTS_PATH, dir_name))
+def move_on_boot() -> threading.Thread:
+    """Syncs the projects directories of the interactomes into the projects directory of the VRNetzer backend. Runs in the background, only added or changed files are placed, see project_sync.sync_projects.
+
+    Returns:
+        threading.Thread: thread running the sync.
+    """
+    return sync_in_background()
 
 
 def set_project(bp, project_name):
@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from . import settings as st
+from .manifest import atomic_write
+from .progress import ProgressReporter, advance, stage
+from .settings import log
+
+
+class ArtifactWriter:
+    """Output stage of the uploader. Every artifact of an upload (textures and JSON files) is queued onto a bounded thread pool and written atomically, so that encoding of the next layout overlaps with compressing and writing the previous one. PNG compression and file writes release the GIL.
+
+    max_workers (int, optional): Number of writer threads. Defaults to settings.WRITER_THREADS.
+    max_pending (int, optional): Maximal number of queued artifacts. Submitting blocks while the queue is full. Defaults to settings.WRITER_MAX_PENDING.
+    png_compress_level (int, optional): zlib compression level (0-9) for PNG textures. Defaults to settings.PNG_COMPRESS_LEVEL.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        max_pending: int = None,
+        png_compress_level: int = None,
+    ) -> None:
+        if max_workers is None:
+            max_workers = st.WRITER_THREADS
+        if max_pending is None:
+            max_pending = st.WRITER_MAX_PENDING
+        if png_compress_level is None:
+            png_compress_level = st.PNG_COMPRESS_LEVEL
+        self.png_compress_level: int = png_compress_level
+        self.timings: dict[str, float] = {}
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="CyExWriter")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures: list[Future] = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.wait()
+        finally:
+            self.close()
+
+    def submit(self, name: str, func, *args, **kwargs) -> Future:
+        """Queue a function which writes an artifact. Blocks while max_pending artifacts are queued.
+
+        Args:
+            name (str): name of the artifact, used to report its timing.
+            func (Callable): function which writes the artifact.
+
+        Returns:
+            Future: future of the queued function.
+        """
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(self._run, name, func, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        self._futures.append(future)
+        return future
+
+    def save_image(self, name: str, image, file: str) -> Future:
+        """Queue a texture. PNG files are compressed with the configured compression level.
+
+        Args:
+            name (str): name of the artifact.
+            image (Image.Image or Callable): image to save or a function which creates it in the writer thread.
+            file (str): path of the written texture.
+
+        Returns:
+            Future: future of the queued write.
+        """
+        return self.submit(name, self._save_image, image, file)
+
+    def write_json(self, name: str, data, file: str) -> Future:
+        """Queue a JSON file.
+
+        Args:
+            name (str): name of the artifact.
+            data (dict or Callable): data to dump or a function which writes the file itself.
+            file (str): path of the JSON file.
+
+        Returns:
+            Future: future of the queued write.
+        """
+        if callable(data):
+            return self.submit(name, data)
+        return self.submit(name, self._dump_json, data, file)
+
+    def wait(self, progress: ProgressReporter = None) -> dict[str, float]:
+        """Wait until every queued artifact is written and log the time spent on each.
+
+        Args:
+            progress (ProgressReporter, optional): reports each written artifact as stage "writing". Defaults to None.
+
+        Raises:
+            Exception: first exception raised while writing an artifact.
+
+        Returns:
+            dict[str, float]: artifact names as keys and seconds spent as values.
+        """
+        futures, self._futures = self._futures, []
+        stage(progress, "writing", total=len(futures), unit="files")
+        errors = []
+        for future in as_completed(futures):
+            errors.append(future.exception())
+            advance(progress)
+        with self._lock:
+            timings, self.timings = self.timings, {}
+        for name, seconds in timings.items():
+            log.info(f"Writing {name} took {seconds:.3f} seconds.", runtime=True)
+        errors = [e for e in errors if e is not None]
+        if errors:
+            raise errors[0]
+        return timings
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def _run(self, name: str, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.timings[name] = time.perf_counter() - start
+            self._slots.release()
+
+    def _save_image(self, image, file: str) -> None:
+        if callable(image):
+            image = image()
+        params = {}
+        if file.endswith(".png"):
+            params["compress_level"] = self.png_compress_level
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        atomic_write(
+            file,
+            lambda tmp: image.save(tmp, **params),
+            suffix=os.path.splitext(file)[1],
+        )
+
+    @staticmethod
+    def _dump_json(data, file: str) -> None:
+        def write(tmp):
+            with open(tmp, "w") as f:
+                json.dump(data, f, default=to_builtin)
+
+        atomic_write(file, write)
+
+
+def to_builtin(obj):
+    """Fallback of the JSON encoder for NumPy scalars and arrays."""
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
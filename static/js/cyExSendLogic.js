@@ -1,6 +1,40 @@
+const cyExSendStages = {
+  queued: "Queued",
+  extract: "Extracting nodes and links",
+  network: "Creating network",
+  style: "Applying style",
+  fit: "Fitting view",
+};
+
+function cyExSendElements() {
+  return document.querySelectorAll("cy-ex-send-element");
+}
+
+function cyExSendElement(sendId) {
+  for (const element of cyExSendElements()) {
+    if (element.sendId == sendId) {
+      return element;
+    }
+  }
+  // Sends started before the page was loaded belong to the first element.
+  return cyExSendElements()[0];
+}
+
 $(document).ready(function () {
+  cyExSocket.on("sendProgress", function (data) {
+    let element = cyExSendElement(data["id"]);
+    if (element == null) {
+      return;
+    }
+    element.sendStarted(data["id"]);
+    element.showProgress(cyExSendStages[data["stage"]] || data["stage"]);
+  });
+
   cyExSocket.on("status", function (data) {
     console.log(data["message"]);
-    // TODO: Enable the send button and remove the loading gif
+    let element = cyExSendElement(data["id"]);
+    if (element != null) {
+      element.sendFinished(data);
+    }
   });
 });
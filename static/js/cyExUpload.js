@@ -51,7 +51,14 @@ $(document).ready(function () {
       processData: false,
       success: function (data) {
         console.log(data);
-        $("#cyEx_upload_message").html(data);
+        if (typeof data === "object" && data.id) {
+          // Upload is queued, poll its state until it is done.
+          $("#cyEx_upload_button").button("disable");
+          showUploadState(data);
+          pollUpload(data.id);
+        } else {
+          $("#cyEx_upload_message").html(data);
+        }
       },
       error: function (err) {
         console.log("Uploaded failed!");
@@ -60,3 +67,52 @@ $(document).ready(function () {
     });
   });
 });
+
+function showUploadState(state) {
+  if (state.status == "done") {
+    $("#cyEx_upload_message").html(state.result);
+  } else if (state.status == "error") {
+    $("#cyEx_upload_message").html(
+      '<a style="color:red;">ERROR: ' + $("<div>").text(state.error).html() + "</a>"
+    );
+  } else {
+    $("#cyEx_upload_message").html(
+      "Upload " + state.status + formatProgress(state.progress) + "..."
+    );
+  }
+}
+
+function formatProgress(progress) {
+  if (!progress || !progress.stage) return "";
+  var text = " (" + progress.stage;
+  if (progress.total) {
+    text += ": " + progress.done + "/" + progress.total + " " + progress.unit;
+  }
+  if (progress.layout) text += ", " + progress.layout;
+  if (progress.eta != null && progress.done < progress.total) {
+    text += ", about " + Math.ceil(progress.eta) + " s left";
+  }
+  return text + ")";
+}
+
+function pollUpload(id) {
+  var url = "http://" + location.host + "/CyEx/upload_status/" + id;
+  $.ajax({
+    type: "GET",
+    url: url,
+    cache: false,
+    success: function (state) {
+      showUploadState(state);
+      if (state.status == "done" || state.status == "error") {
+        $("#cyEx_upload_button").button("enable");
+      } else {
+        setTimeout(pollUpload, 1000, id);
+      }
+    },
+    error: function (err) {
+      console.log("Could not fetch upload state!");
+      $("#cyEx_upload_message").html("Upload failed");
+      $("#cyEx_upload_button").button("enable");
+    },
+  });
+}
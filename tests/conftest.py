@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The extension is imported as the package src, like the backend imports it from the extensions folder.
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+from src.cx2 import build_cx2, push_cx2
+from src.mock_cyrest import MockCyREST
+
+
+def aspect(document: list[dict], name: str):
+    return next(a[name] for a in document if name in a)
+
+
+def network(dims: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    nodes = pd.DataFrame(
+        {
+            "id": ["3", "5", "7"],
+            "name": ["a", "b", "c"],
+            "size": [10, 20, 30],
+            "color": ["#ff0000", "#00ff00", "#0000ff"],
+            "x": [0, 500, 1000],
+            "y": [1000, 500, 0],
+            "z": [250, 500, 750],
+        },
+        index=[3, 5, 7],
+    )
+    if dims == 2:
+        nodes = nodes.drop(columns=["z"])
+    links = pd.DataFrame(
+        {"source": ["3", "5"], "target": ["5", "7"], "interaction": ["pp", "pp"]}
+    )
+    return nodes, links
+
+
+@pytest.fixture
+def mock():
+    with MockCyREST() as mock:
+        yield mock
+
+
+@pytest.mark.parametrize("dims", [2, 3])
+def test_push_cx2_posts_document(mock, dims):
+    nodes, links = network(dims)
+    document = build_cx2(nodes, links, "layout & color")
+
+    suid = push_cx2(mock.base_url, document, "project")
+
+    assert mock.requests == [("POST", "/v1/networks"), ("GET", f"/v1/apply/fit/{suid}")]
+    posted = mock.networks[suid]
+    assert posted == document
+    assert aspect(posted, "networkAttributes") == [{"name": "layout & color"}]
+
+    cx_nodes = aspect(posted, "nodes")
+    assert [n["id"] for n in cx_nodes] == [3, 5, 7]
+    assert [n["x"] for n in cx_nodes] == [0.0, 500.0, 1000.0]
+    assert [n["v"]["name"] for n in cx_nodes] == ["a", "b", "c"]
+    assert [(e["s"], e["t"]) for e in aspect(posted, "edges")] == [(3, 5), (5, 7)]
+
+    mapping = aspect(posted, "visualProperties")[0]["nodeMapping"]
+    assert mapping["NODE_X_LOCATION"]["definition"]["attribute"] == "x"
+    assert mapping["NODE_BACKGROUND_COLOR"]["definition"]["attribute"] == "color"
+    if dims == 3:
+        assert mapping["NODE_Z_LOCATION"]["definition"]["attribute"] == "z"
+        assert [n["z"] for n in cx_nodes] == [250.0, 500.0, 750.0]
+    else:
+        assert "NODE_Z_LOCATION" not in mapping
+        assert all("z" not in n for n in cx_nodes)
+
+    rows = mock.tables[suid]["defaultnode"].values()
+    assert sorted(row["name"] for row in rows) == ["a", "b", "c"]
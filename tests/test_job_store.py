@@ -0,0 +1,22 @@
+from src import job_store
+from src.job_store import JobStore
+
+JOB_ID = "ab" * 32
+
+
+def test_resubmitted_job_gets_a_new_time_to_live(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(job_store.time, "time", lambda: now[0])
+    store = JobStore(str(tmp_path), ttl=100)
+
+    store.put(JOB_ID, {"nodes": []})
+    now[0] += 90
+    store.put(JOB_ID, {"nodes": []})
+    now[0] += 90
+
+    assert JOB_ID in store
+    assert store.get(JOB_ID) == {"nodes": []}
+    now[0] += 20
+    store.evict()
+    assert JOB_ID not in store
+    assert not (tmp_path / f"{JOB_ID}.json.gz").exists()
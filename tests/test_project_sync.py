@@ -0,0 +1,22 @@
+import os
+
+from src.project_sync import SYNC_MANIFEST_FILE, staging_dir, sync_projects
+
+
+def test_sync_assembles_projects_outside_the_projects_directory(tmp_path):
+    source, target = tmp_path / "bundle", tmp_path / "static" / "projects"
+    (source / "demo" / "layouts").mkdir(parents=True)
+    (source / "demo" / "layouts" / "a.bmp").write_bytes(b"pixels")
+    target.mkdir(parents=True)
+    # Left behind by a sync which was interrupted.
+    stale = os.path.join(staging_dir(str(target)), "demo.999999999")
+    os.makedirs(stale)
+
+    results = sync_projects(str(source), str(target), threads=2)
+
+    assert results["demo"]["unchanged"] == 0
+    assert sorted(os.listdir(target)) == ["demo"]
+    assert sorted(os.listdir(target / "demo")) == [SYNC_MANIFEST_FILE, "layouts"]
+    assert (target / "demo" / "layouts" / "a.bmp").read_bytes() == b"pixels"
+    assert not os.path.exists(stale)
+    assert os.listdir(staging_dir(str(target))) == []
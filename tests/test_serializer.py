@@ -0,0 +1,44 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.serializer import write_records
+from src.writer import to_builtin
+
+
+def legacy_json(df: pd.DataFrame, key: str) -> str:
+    """Output of the record lists which were built with iterrows before."""
+    records = [v.dropna().to_dict() for _, v in df.iterrows()]
+    return json.dumps({key: records}, default=to_builtin)
+
+
+FRAMES = {
+    "mixed": pd.DataFrame(
+        {
+            "id": [0, 1, 2],
+            "n": ["a", None, "c"],
+            "size": [1.5, np.nan, 3.0],
+            "flag": [True, False, True],
+            "pos": [[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]],
+        }
+    ),
+    "numeric": pd.DataFrame(
+        {"id": [0, 1, 2], "s": [0, 0, 1], "e": [1.0, 2.0, np.nan]}
+    ),
+    "integer": pd.DataFrame({"id": [0, 1], "s": [0, 1], "e": [1, 0]}),
+}
+
+
+@pytest.mark.parametrize("name", FRAMES)
+def test_write_records_matches_legacy(tmp_path, name):
+    df = FRAMES[name]
+    file = tmp_path / "nodes.json"
+    offsets = write_records(df, str(file), "nodes", chunk_size=2)
+    text = file.read_text()
+    assert text == legacy_json(df, "nodes")
+    records = json.loads(text)["nodes"]
+    for idx, record in enumerate(records):
+        raw = text[offsets[idx] : offsets[idx + 1]].rstrip(", ")
+        assert json.loads(raw) == record
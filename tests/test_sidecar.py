@@ -0,0 +1,23 @@
+import os
+
+import pandas as pd
+
+from src.sidecar import has_index, read_records, write_indexed
+
+
+def test_index_is_outdated_after_rewrite_with_same_size(tmp_path):
+    location = str(tmp_path)
+    write_indexed(location, "nodes", pd.DataFrame({"id": [0, 1], "n": ["a", "b"]}))
+    assert has_index(location, "nodes")
+    assert read_records(location, "nodes", [1]) == [{"id": 1, "n": "b"}]
+
+    json_file = os.path.join(location, "nodes.json")
+    stat = os.stat(json_file)
+    with open(json_file, "r") as f:
+        text = f.read()
+    with open(json_file, "w") as f:
+        f.write(text.replace('"b"', '"c"'))
+    os.utime(json_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    assert os.path.getsize(json_file) == stat.st_size
+    assert not has_index(location, "nodes")
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from src.textures import decode_positions, encode_positions
+
+
+def test_decode_positions_inverts_encode_positions():
+    positions = np.random.default_rng(0).random((100, 3))
+    positions[0] = [0.0, 0.5, 1.0]
+    high, low = encode_positions(positions)
+
+    decoded = decode_positions(high, low)
+
+    assert np.all(np.abs(decoded - positions) <= 1 / 65280)
+    assert decoded[0].tolist() == [0.0, 0.5, 1.0]
+
+
+@pytest.mark.parametrize(
+    "high, low, expected",
+    [
+        ((0, 0, 0), (0, 0, 0), 0.0),
+        ((128, 0, 0), (0, 0, 0), 0.5),
+        ((255, 0, 0), (255, 0, 0), 1.0),
+    ],
+)
+def test_decode_positions_scaling(high, low, expected):
+    decoded = decode_positions(np.array([high]), np.array([low]))
+    assert decoded[0, 0] == expected
+
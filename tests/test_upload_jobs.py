@@ -0,0 +1,21 @@
+from src.upload_jobs import UploadJob, UploadQueue
+
+
+def upload(job: UploadJob, location: str) -> str:
+    job.location = location
+    return "uploaded"
+
+
+def test_find_returns_latest_upload_of_project(tmp_path):
+    queue = UploadQueue(workers=1, cpus=1, memory=1024**3)
+    first = queue.submit(upload, str(tmp_path), key="a", project="p")
+    queue.shutdown()
+    assert queue.find("a", "p") is first
+    assert queue.find("a") is first
+    assert queue.find("a", "q") is None
+
+    queue.submit(upload, str(tmp_path), key="b", project="p")
+    queue.shutdown()
+    # The project was overwritten by a different upload since.
+    assert queue.find("a", "p") is None
+    assert queue.find("a") is first